@@ -0,0 +1,211 @@
+"""Benchmark sweeps over N and solver methods.
+
+Usage:
+    python -m bench --n 4-10 --methods backtracking,dfs --repeat 5 --json results.json
+    python -m bench --n 8,10 --compare results.json
+
+Every (method, N) pair runs in its own process with warmups, repeats and a
+timeout. The solvers run with rendering off and no cache, so only the search is
+timed (perf_counter_ns). Peak memory (tracemalloc) and the search counters
+(SearchStats) are measured in separate, untimed runs; ns_per_node tells a slower
+algorithm (more nodes) from more overhead per node.
+"""
+import argparse
+import csv
+import json
+import math
+import multiprocessing
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from methods.a_star import AStarSolver
+from methods.backtracking import BacktrackingSolver
+from methods.bfs_dfs import BFSSolver, DFSSolver
+from methods.constructive import ConstructiveSolver
+from methods.brute_force import BruteForceSolver
+from methods.genetic import GeneticSolver
+from methods.min_conflicts import MinConflictsSolver
+from methods.reinforcement import ReinforcementSolver
+
+METHODS = {
+    "backtracking": (BacktrackingSolver, {}),
+    "backtracking-bitmask": (BacktrackingSolver, {"engine": "bitmask"}),
+    "backtracking-symmetry": (BacktrackingSolver, {"engine": "bitmask", "symmetry": True}),
+    "bfs": (BFSSolver, {}),
+    "dfs": (DFSSolver, {}),
+    "astar": (AStarSolver, {}),
+    "ida": (AStarSolver, {"mode": "ida"}),
+    "brute-force": (BruteForceSolver, {}),
+    "genetic": (GeneticSolver, {}),
+    "genetic-numpy": (GeneticSolver, {"backend": "numpy"}),
+    "min-conflicts": (MinConflictsSolver, {}),
+    "reinforcement": (ReinforcementSolver, {}),
+    "constructive": (ConstructiveSolver, {}),
+}
+
+FIELDS = ["method", "N", "status", "solutions", "runs", "median_ms", "p95_ms", "min_ms", "mean_ms",
+          "peak_memory_bytes", "nodes_expanded", "ns_per_node"]
+
+
+def make_solver(method, N, stats=None, **options):
+    solver_class, kwargs = METHODS[method]
+    return solver_class(N, render="off", keep_solutions=False, stats=stats, **kwargs, **options)
+
+
+def time_run(method, N):
+    """Time one full enumeration (or search) in nanoseconds; returns (elapsed_ns, solutions)."""
+    solver = make_solver(method, N)
+    start = time.perf_counter_ns()
+    solutions = solver.count_solutions()
+    return time.perf_counter_ns() - start, solutions
+
+
+def measure(method, N, warmup, repeat, memory, results):
+    """Child process entry point: warmups, timed repeats and an optional tracemalloc run."""
+    for _ in range(warmup):
+        time_run(method, N)
+    timings, solutions = [], None
+    for _ in range(repeat):
+        elapsed, solutions = time_run(method, N)
+        timings.append(elapsed)
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        make_solver(method, N).count_solutions()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    solver = make_solver(method, N, stats=True)
+    solver.count_solutions()
+    results.put((timings, solutions, peak, solver.stats.nodes_expanded))
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def run_benchmark(method, N, warmup=1, repeat=5, timeout=60.0, memory=True):
+    """Benchmark one (method, N) pair in a separate process and return its result row."""
+    results = multiprocessing.Queue()
+    process = multiprocessing.Process(target=measure, args=(method, N, warmup, repeat, memory, results))
+    process.start()
+    process.join(timeout)
+
+    row = {"method": method, "N": N, "status": "ok", "solutions": None, "runs": 0, "median_ms": None,
+           "p95_ms": None, "min_ms": None, "mean_ms": None, "peak_memory_bytes": None, "nodes_expanded": None,
+           "ns_per_node": None}
+    if process.is_alive():
+        process.terminate()
+        process.join()
+        row["status"] = "timeout"
+        return row
+    if results.empty():
+        row["status"] = "error"
+        return row
+
+    timings, solutions, peak, nodes = results.get()
+    timings_ms = [t / 1e6 for t in timings]
+    row.update(solutions=solutions, runs=len(timings_ms), median_ms=statistics.median(timings_ms),
+               p95_ms=percentile(timings_ms, 0.95), min_ms=min(timings_ms),
+               mean_ms=statistics.fmean(timings_ms), peak_memory_bytes=peak, nodes_expanded=nodes,
+               ns_per_node=statistics.median(timings) / nodes if nodes else None)
+    return row
+
+
+def parse_n(spec):
+    """'4-10' or '8,10,12' (or a mix, '4-6,8') -> list of ints."""
+    values = []
+    for part in spec.split(","):
+        if "-" in part:
+            low, high = part.split("-")
+            values.extend(range(int(low), int(high) + 1))
+        elif part:
+            values.append(int(part))
+    return values
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(rows, baseline_path, threshold):
+    """Rows whose median got slower than the baseline by more than `threshold` (a fraction)."""
+    with open(baseline_path) as f:
+        baseline = {(row["method"], row["N"]): row for row in json.load(f)["results"]}
+    regressions = []
+    for row in rows:
+        old = baseline.get((row["method"], row["N"]))
+        if not old or old["median_ms"] is None:
+            continue
+        if row["median_ms"] is None:
+            regressions.append((row, old, math.inf))  # Used to finish, now times out
+        elif row["median_ms"] > old["median_ms"] * (1 + threshold):
+            regressions.append((row, old, row["median_ms"] / old["median_ms"] - 1))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench", description=__doc__.splitlines()[0])
+    parser.add_argument("--n", default="4-8", help="board sizes, e.g. 4-10 or 8,10,12")
+    parser.add_argument("--methods", default="backtracking,backtracking-bitmask,dfs,bfs",
+                        help=f"comma-separated subset of: {', '.join(METHODS)}")
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds per method and N")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    parser.add_argument("--json", help="write results to this JSON file")
+    parser.add_argument("--csv", help="write results to this CSV file")
+    parser.add_argument("--compare", help="baseline JSON file from an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="allowed slowdown against the baseline (fraction, default 0.10)")
+    args = parser.parse_args(argv)
+
+    methods = [m.strip() for m in args.methods.split(",") if m.strip()]
+    unknown = [m for m in methods if m not in METHODS]
+    if unknown:
+        parser.error(f"unknown methods: {', '.join(unknown)}")
+
+    rows = []
+    for N in parse_n(args.n):
+        for method in methods:
+            row = run_benchmark(method, N, args.warmup, args.repeat, args.timeout, not args.no_memory)
+            rows.append(row)
+            if row["status"] == "ok":
+                print(f"{method:>24} N={N:<3} median {row['median_ms']:10.3f} ms  p95 {row['p95_ms']:10.3f} ms  "
+                      f"solutions {row['solutions']}  nodes {row['nodes_expanded']}")
+            else:
+                print(f"{method:>24} N={N:<3} {row['status']}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"commit": git_commit(), "python": platform.python_version(), "timestamp": time.time(),
+                       "results": rows}, f, indent=2)
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+
+    if args.compare:
+        regressions = compare(rows, args.compare, args.threshold)
+        for row, old, slowdown in regressions:
+            print(f"REGRESSION {row['method']} N={row['N']}: {old['median_ms']:.3f} ms -> "
+                  f"{row['median_ms'] if row['median_ms'] is not None else row['status']} ({slowdown:+.0%})")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+from collections import OrderedDict
+
+
+def constraint_masks(N, fixed, blocked, attacks=True):
+    """Allowed columns of every row (bitmasks) for pre-placed queens and blocked squares.
+
+    `fixed` maps rows to the column of their queen, `blocked` is a set of
+    (row, col) squares. A fixed queen leaves only its own square in its row and,
+    with `attacks`, removes every square it attacks from the other rows (two
+    fixed queens that attack each other then leave no completion). Without
+    `attacks` the masks only say what the query itself forbids, which is what
+    CompletionMemo keys on.
+    """
+    full = (1 << N) - 1
+    masks = [full] * N
+    for row, col in blocked:
+        if not (0 <= row < N and 0 <= col < N):
+            raise ValueError(f"Blocked square {(row, col)} is off the {N}x{N} board")
+        masks[row] &= ~(1 << col)
+    for row, col in fixed.items():
+        if not (0 <= row < N and 0 <= col < N):
+            raise ValueError(f"Fixed queen {(row, col)} is off the {N}x{N} board")
+        if not attacks:
+            masks[row] &= 1 << col
+            continue
+        for other in range(N):
+            if other == row:
+                masks[other] &= 1 << col
+                continue
+            distance = abs(other - row)
+            attacked = 1 << col
+            if col + distance < N:
+                attacked |= 1 << (col + distance)
+            if col - distance >= 0:
+                attacked |= 1 << (col - distance)
+            masks[other] &= ~attacked
+    return masks
+
+
+class CompletionMemo:
+    """Completion counts of partial boards, shared by queries that reach the same subproblem.
+
+    A subproblem is the next row, the occupied columns and diagonals and the
+    constraints of the remaining rows, so queries with different fixed queens or
+    blocked squares still share every subtree whose remaining constraints agree
+    (e.g. a query that fixes one more queen than an earlier one). Subtrees with
+    fewer than `min_rows` rows left are cheaper to search than to look up and
+    are not stored; beyond `max_entries` the least recently used go first.
+    """
+
+    def __init__(self, max_entries=1_000_000, min_rows=6):
+        self.max_entries = max_entries
+        self.min_rows = min_rows
+        self.counts = OrderedDict()
+        self.suffixes = {}  # (N, allowed masks of the remaining rows) -> small int id
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.counts)
+
+    def suffix_id(self, N, masks):
+        """Small int standing for the constraints of the remaining rows, for cheap hashing."""
+        return self.suffixes.setdefault((N, tuple(masks)), len(self.suffixes))
+
+    def get(self, key):
+        count = self.counts.get(key)
+        if count is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.counts.move_to_end(key)
+        return count
+
+    def put(self, key, count):
+        if len(self.counts) >= self.max_entries:
+            self.counts.popitem(last=False)
+        self.counts[key] = count
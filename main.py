@@ -5,9 +5,19 @@ from methods.a_star import AStarSolver
 from methods.genetic import GeneticSolver
 from methods.reinforcement import ReinforcementSolver
 from methods.brute_force import BruteForceSolver
+from methods.min_conflicts import MinConflictsSolver
+from methods.constructive import ConstructiveSolver
+from solution_cache import SolutionCache
 from visualizer import visualize_solution
 
 N = 10
+RENDER_MODE = "all"  # "off", "first-k" or "all"
+RENDER_LIMIT = 10  # Images per method in "first-k" mode
+USE_CACHE = False  # Reuse counts/solutions of earlier runs of the same method (skews the comparison)
+SEARCH_STATS = False  # Report nodes expanded, rejected moves and branching per depth
+TIME_LIMIT = None  # Seconds per method; a stopped run reports status "timeout" and partial metrics
+
+cache = SolutionCache() if USE_CACHE else None
 
 solver = NQueensSolver(N)
 methods = [
@@ -16,20 +26,24 @@ methods = [
     DFSSolver,
     AStarSolver,
     GeneticSolver,
-    #ReinforcementSolver,
-    BruteForceSolver
+    ReinforcementSolver,
+    BruteForceSolver,
+    MinConflictsSolver,
+    ConstructiveSolver
 ]
 
 for method in methods:
     print(f"Running {method.__name__}...")
-    instance = method(N)
+    instance = method(N, render=RENDER_MODE, render_limit=RENDER_LIMIT, cache=cache, stats=SEARCH_STATS,
+                      time_limit=TIME_LIMIT)
     instance.solve()
     solver.metrics.extend(instance.metrics)
-    solver.solutions.extend(instance.solutions)
 
 print("\nΑποτελέσματα Μετρικών:")
 for metric in solver.metrics:
     print(metric)
 
-if solver.solutions:
-    visualize_solution(N, solver.solutions[0])
+# Stream just the first solution instead of keeping every board in memory
+first_solution = next(solver.iter_solutions(limit=1), None)
+if first_solution is not None:
+    visualize_solution(N, first_solution, f"solution_{N}.png")
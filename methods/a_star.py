@@ -1,98 +1,278 @@
 import time
-import os
 import heapq
+import tracemalloc
 from n_queens_solver import NQueensSolver
-from visualizer import visualize_solution
+
+INFINITY = float("inf")
+
+
+def add_bits(counters, bits):
+    """Add 1 to the bit-sliced counters (counters[i] holds bit i of every count) at each set bit of `bits`."""
+    for i, counter in enumerate(counters):
+        if not bits:
+            return
+        counters[i] = counter ^ bits
+        bits &= counter
+    if bits:
+        counters.append(bits)
+
 
 class AStarSolver(NQueensSolver):
-    def __init__(self, N):
-        super().__init__(N)
+    MODES = ("astar", "ida", "beam")
+
+    def __init__(self, N, mode="astar", beam_width=64, track_memory=False, **kwargs):
+        super().__init__(N, **kwargs)
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown A* mode: {mode!r}")
+        self.mode = mode
+        self.beam_width = beam_width
+        # Opt-in: tracemalloc slows the search down about tenfold; peak_states is always reported
+        self.track_memory = track_memory
+        if mode == "beam":
+            self.EXHAUSTIVE = False  # The beam drops part of every level
+        self.peak_states = 0
         self.all_solutions = []
 
     def solve(self):
         start_time = time.time()
+        self.open_render_queue(f"a_star_solutions_{self.N}")
+        tracing = self.track_memory and not tracemalloc.is_tracing()  # Leave an outer trace running
+        if tracing:
+            tracemalloc.start()
 
+        for state in self.iter_solutions():
+            self.collect_solution(state)
 
-        method_folder = f"a_star_solutions_{self.N}"
-        if not os.path.exists(method_folder):
-            os.makedirs(method_folder)
+        exec_time = time.time() - start_time
+        solutions_found = self.solutions_found
+        metrics = {
+            "method": {"astar": "A*", "ida": "IDA*", "beam": f"Beam search (width {self.beam_width})"}[self.mode],
+            "time": exec_time,
+            "solutions_found": solutions_found,
+            "efficiency": solutions_found / exec_time if exec_time > 0 else 0,
+            "peak_states": self.peak_states,
+        }
+        if self.track_memory:
+            metrics["peak_memory"] = tracemalloc.get_traced_memory()[1]
+        if tracing:
+            tracemalloc.stop()
+        self.metrics.append(self.finish_run(metrics))
 
+    def generate_solutions(self):
+        """Run the configured search; peak_states records the most states held at once."""
+        self.peak_states = 0
+        if self.mode == "ida":
+            return self.ida_star()
+        if self.mode == "beam":
+            return self.beam_search()
+        return self.a_star()
 
+    def a_star(self):
+        """A* search over partial boards, yielding every goal state it pops."""
+        stats = self.stats
         open_list = []
         heapq.heappush(open_list, (0, [-1] * self.N))
         g_cost = {tuple([-1] * self.N): 0}
-        solutions_found = 0
 
+        budget = self.budget
         while open_list:
+            if budget is not None and budget.spend() and self.interrupted():
+                return
             _, state = heapq.heappop(open_list)
             state_tuple = tuple(state)
+            board = self.board_state(state)
 
-            if self.is_goal_state(state):
-                self.all_solutions.append(state_tuple)
-                solution_image_path = f"{method_folder}/solution_{solutions_found}.png"
-                visualize_solution(self.N, state, solution_image_path)
-                solutions_found += 1
+            if self.is_goal_state(board):
+                yield state_tuple
                 continue
 
 
-            for next_state in self.get_possible_next_states(state):
+            next_row = state.index(-1)
+            next_states = self.get_possible_next_states(state, board)
+            if stats is not None:
+                stats.expand(next_row, len(next_states), self.N - len(next_states))
+            for next_state in next_states:
                 next_state_tuple = tuple(next_state)
+                # Children only take safe squares, so every partial board is conflict-free and
+                # the queue is ordered by depth alone
                 g_cost_new = g_cost[state_tuple] + 1
-                f_cost = g_cost_new + self.heuristic(next_state)
+                f_cost = g_cost_new
 
                 if next_state_tuple not in g_cost or g_cost_new < g_cost[next_state_tuple]:
                     g_cost[next_state_tuple] = g_cost_new
                     heapq.heappush(open_list, (f_cost, next_state))
 
-        exec_time = time.time() - start_time
-        self.metrics.append({
-            "method": "A*",
-            "time": exec_time,
-            "solutions_found": solutions_found,
-            "efficiency": solutions_found / exec_time if exec_time > 0 else 0,
-        })
-
-    def is_goal_state(self, state):
-        """Check if the state is a valid solution (no attacking queens)."""
-        return -1 not in state and self.is_valid_board(state)
-
-    def get_possible_next_states(self, state):
-        """Generate all valid next states by placing queens in the next row."""
-        next_states = []
-        next_row = state.index(-1)
-
-        for col in range(self.N):
-            if self.is_valid_move(state, next_row, col):
-                new_state = state.copy()
-                new_state[next_row] = col
-                next_states.append(new_state)
-
-        return next_states
-
-    def is_valid_move(self, state, row, col):
-        """Check if placing a queen at (row, col) is valid."""
-        for r in range(row):
-            if state[r] == col or abs(state[r] - col) == abs(r - row):  # Same column or diagonal
-                return False
-        return True
-
-    def is_valid_board(self, state):
-        """Check if the entire board configuration is valid (no conflicts)."""
-        for i in range(len(state)):
-            for j in range(i + 1, len(state)):
-                if state[i] == state[j] or abs(state[i] - state[j]) == abs(i - j):
-                    return False
-        return True
-
-    def compute_reward(self, state):
-        """Compute the reward for a given state (lower is better)."""
-        conflicts = 0
-        for i in range(self.N):
-            for j in range(i + 1, self.N):
-                if abs(state[i] - state[j]) == abs(i - j):  # Diagonal conflict
-                    conflicts += 1
-        return conflicts
-
-    def heuristic(self, state):
-        """Heuristic function to estimate cost to reach the goal (number of conflicts)."""
-        return self.compute_reward(state)
+            self.peak_states = max(self.peak_states, len(open_list) + len(g_cost))
+            if stats is not None:
+                stats.frontier(len(open_list))
+
+    # Bounded-memory modes work on the packed nodes of NQueensSolver (see root_node/child_nodes)
+
+    def node_estimate(self, node):
+        """(h, tightest row, free squares) of a node.
+
+        h is the number of rows left, which is exact whenever the board can still
+        be completed, and infinite once some remaining row has no free square left.
+        The other two break ties in the beam: the fewest free squares in any remaining
+        row, then the free squares overall; more room is more promising.
+        """
+        cols, diag, anti_diag, depth, _ = node
+        full = (1 << self.N) - 1
+        free_squares = 0
+        tightest = self.N
+        for _ in range(self.N - depth):
+            free = full & ~(cols | diag | anti_diag)
+            if not free:
+                return INFINITY, 0, 0
+            count = free.bit_count()
+            free_squares += count
+            tightest = min(tightest, count)
+            diag = (diag << 1) & full
+            anti_diag >>= 1
+        return self.N - depth, tightest, free_squares
+
+    def child_heuristics(self, node):
+        """Children of a node (as child_nodes yields them) paired with the h of their node_estimate.
+
+        Derived from the node: a child is a dead end only if its queen takes the last
+        free squares of some row, and a queen takes at most 3 squares of a row, so
+        only the node's rows with at most 3 free squares are checked.
+        """
+        N = self.N
+        cols, diag, anti_diag, depth, _ = node
+        full = (1 << N) - 1
+        scarce = []  # (rows below the next one, free squares) of the rows with at most 3 free squares
+        for below in range(1, N - depth):
+            diag = (diag << 1) & full
+            anti_diag >>= 1
+            free = full & ~(cols | diag | anti_diag)
+            if free.bit_count() <= 3:
+                scarce.append((below, free))
+        shift = self.column_bits * depth
+        mask = (1 << self.column_bits) - 1
+        h_cost = N - depth - 1
+        for child in self.child_nodes(node):
+            col = child[4] >> shift & mask
+            for below, free in scarce:
+                if not free & ~(1 << col | 1 << (col + below) | (1 << (col - below) if col >= below else 0)):
+                    yield child, INFINITY
+                    break
+            else:
+                yield child, h_cost
+
+    def ida_star(self):
+        """Iterative-deepening A*: depth-first passes bounded by f = g + h, memory O(N^2)."""
+        root = self.root_node()
+        threshold = self.node_estimate(root)[0]
+        budget = self.budget
+        while threshold < INFINITY:
+            next_threshold = INFINITY
+            stack = [root]
+            while stack:
+                if budget is not None and budget.spend() and self.interrupted():
+                    return
+                node = stack.pop()
+                if node[3] == self.N:
+                    yield tuple(self.unpack_placement(node[4]))
+                    continue
+                # Push in reverse so the lowest column is expanded first
+                for child, h_cost in reversed(list(self.child_heuristics(node))):
+                    f_cost = child[3] + h_cost
+                    if f_cost <= threshold:
+                        stack.append(child)
+                    else:
+                        next_threshold = min(next_threshold, f_cost)
+                self.peak_states = max(self.peak_states, len(stack))
+                if self.stats is not None:
+                    self.stats.frontier(len(stack))
+            # Goals sit at f = N and h is exact for completable boards, so the first pass
+            # already reaches every goal; anything pruned had h = infinity
+            threshold = next_threshold
+
+    def beam_search(self):
+        """Beam search that fills the most constrained row first, keeping beam_width nodes per level.
+
+        Nodes are (cols, diag, anti_diag, placed rows, placement) with the diagonals
+        indexed absolutely (col - row + N - 1 and row + col), since rows are no longer
+        filled in order. Children are ranked least constraining first (most free
+        squares left in the other rows, then the largest tightest row), and the beam
+        takes the best child of every node before the second best of any, so the
+        siblings of one prefix cannot fill it.
+        """
+        level = [(0, 0, 0, 0, 0)]
+        budget = self.budget
+        for _ in range(self.N):
+            scored = []
+            for node in level:
+                if budget is not None and budget.spend() and self.interrupted():
+                    return
+                children = sorted(self.constrained_children(node))
+                scored.extend((rank,) + child for rank, child in enumerate(children))
+            self.peak_states = max(self.peak_states, len(scored))
+            if self.stats is not None:
+                self.stats.frontier(len(scored))
+            level = [entry[-1] for entry in heapq.nsmallest(self.beam_width, scored)]
+        for node in level:
+            yield tuple(self.unpack_placement(node[4]))
+
+    def constrained_children(self, node):
+        """(-free squares left, -tightest row, placement, child) for every live child of a beam node.
+
+        The queen goes in the unplaced row with the fewest free squares. One pass
+        over the other unplaced rows adds up, in bit-sliced counters, their free
+        squares per column, diagonal and anti-diagonal; a queen takes exactly the
+        free squares of its three lines (which only meet on its own square), so the
+        squares a child leaves cost O(log N). Only rows with at most 3 more free
+        squares than the tightest one found can become its tightest (or empty).
+        """
+        N = self.N
+        cols, diag, anti_diag, placed, placement = node
+        full = (1 << N) - 1
+        free_rows = {}
+        for row in range(N):
+            if not placed >> row & 1:
+                free = full & ~(cols | diag >> (N - 1 - row) | anti_diag >> row)
+                if self.row_masks is not None:
+                    free &= self.row_masks[row]
+                free_rows[row] = free
+        counts = {row: free.bit_count() for row, free in free_rows.items()}
+        target = min(counts, key=lambda row: (counts[row], row))
+        free = free_rows.pop(target)
+        del counts[target]
+        if self.stats is not None:
+            children = free.bit_count()
+            self.stats.expand(N - len(free_rows) - 1, children, N - children)
+
+        on_cols, on_diags, on_anti_diags = [], [], []  # Bit-sliced free squares per line
+        for row, row_free in free_rows.items():
+            add_bits(on_cols, row_free)
+            add_bits(on_diags, row_free << (N - 1 - row))
+            add_bits(on_anti_diags, row_free << row)
+        free_left = sum(counts.values())
+        candidates = sorted(counts, key=counts.__getitem__)
+        shift = self.column_bits * target
+        while free:
+            bit = free & -free
+            free ^= bit
+            col = bit.bit_length() - 1
+            tightest = N
+            for row in candidates:
+                if counts[row] - 3 >= tightest:
+                    break  # No later row can get below the tightest one
+                offset = row - target
+                attacked = bit | (1 << (col + offset) if 0 <= col + offset else 0) \
+                    | (1 << (col - offset) if 0 <= col - offset else 0)
+                tightest = min(tightest, (free_rows[row] & ~attacked).bit_count())
+                if not tightest:
+                    break
+            if not tightest:
+                continue
+            diag_index = col - target + N - 1
+            anti_index = target + col
+            taken = sum((on_cols[i] >> col & 1) << i for i in range(len(on_cols)))
+            taken += sum((on_diags[i] >> diag_index & 1) << i for i in range(len(on_diags)))
+            taken += sum((on_anti_diags[i] >> anti_index & 1) << i for i in range(len(on_anti_diags)))
+            child_placement = placement | col << shift
+            yield (taken - free_left, -tightest, child_placement,
+                   (cols | bit, diag | 1 << diag_index, anti_diag | 1 << anti_index, placed | 1 << target,
+                    child_placement))
@@ -1,49 +1,156 @@
 import time
-import os
 from n_queens_solver import NQueensSolver
-from visualizer import visualize_solution
 
 class BacktrackingSolver(NQueensSolver):
-    def __init__(self, N):
-        super().__init__(N)
+    ENGINES = ("recursive", "bitmask")
+    RESUMABLE = True  # Checkpoint positions are paths of columns, shared by both engines
+
+    def __init__(self, N, engine="recursive", workers=None, split_depth=2, **kwargs):
+        super().__init__(N, **kwargs)
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown backtracking engine: {engine!r}")
+        self.use_workers(workers, split_depth)
+        self.engine = engine
         self.all_solutions = []
 
     def solve(self):
         start_time = time.time()
-
-
-        method_folder = f"backtracking_solutions_{self.N}"
-        if not os.path.exists(method_folder):
-            os.makedirs(method_folder)
+        self.open_render_queue(f"backtracking_solutions_{self.N}")
 
         # Start backtracking from the first row
-        self.backtrack([], 0)
+        for state in self.iter_solutions():
+            self.collect_solution(state)
 
         exec_time = time.time() - start_time
-        self.metrics.append({
-            "method": "Backtracking",
+        metrics = {
+            "method": "Backtracking" if self.engine == "recursive" else "Backtracking (bitmask)",
             "time": exec_time,
-            "iterations": len(self.all_solutions),
-            "efficiency": len(self.all_solutions) / exec_time if exec_time > 0 else 0,
-            "solutions_found": len(self.all_solutions)
-        })
+            "iterations": self.solutions_found,
+            "efficiency": self.solutions_found / exec_time if exec_time > 0 else 0,
+            "solutions_found": self.solutions_found
+        }
+        self.add_symmetry_metrics(metrics)
+        if self.worker_metrics is not None:
+            metrics["method"] = "Backtracking (parallel)"
+            metrics["workers"] = self.worker_metrics
+        self.metrics.append(self.finish_run(metrics))
+
+    def generate_solutions(self):
+        """Yield every solution with the configured engine."""
+        self.worker_metrics = None
+        if self.workers and self.workers > 1:
+            return self.parallel_solutions("bitmask_search")
+        if self.engine == "bitmask":
+            return self.bitmask_search(resume=self.resume_position)
+        return self.backtrack([], 0, self.resume_position or ())
 
-    def backtrack(self, state, row):
-        """Recursive backtracking method."""
+    def backtrack(self, state, row, resume=(), board=None):
+        """Recursive backtracking method.
+
+        `resume` is the rest of a checkpointed path: the search skips everything
+        before it and continues with the subtree it leads to. `board` is the
+        BoardState of `state`, shared by the whole recursion.
+        """
+        if board is None:
+            board = self.board_state(state)
+        budget = self.budget
+        if budget is not None and budget.spend() and self.interrupted(state):
+            return
         if row == self.N:
-            solution_image_path = f"backtracking_solutions_{self.N}/solution_{len(self.all_solutions)}.png"
-            visualize_solution(self.N, state, solution_image_path)
-            #print(f"Solution found: {state}")
-            self.all_solutions.append(state)
+            yield state
+            return
+
+        candidates = self.candidate_columns(state, row)
+        children = 0
+        for col in candidates:
+            if resume and col < resume[0]:
+                continue
+            if board.is_safe(row, col):
+                children += 1
+                board.place(row, col)
+                yield from self.backtrack(state + [col], row + 1, resume[1:] if resume and col == resume[0] else (),
+                                          board)
+                board.remove(row)
+                if budget is not None and budget.stopped:
+                    return
+        if self.stats is not None:
+            self.stats.expand(row, children, len(candidates) - children)
+
+    def bitmask_search(self, prefix=(), resume=None):
+        """Iterative backtracking over column/diagonal bitmasks with a fixed-size stack.
+
+        Yields every completion of the (valid) prefix placement, lowest column first.
+        `resume` is a checkpointed path (which extends the prefix) to continue from.
+        """
+        N = self.N
+        start = len(prefix)
+        if start == N:
+            yield list(prefix)
             return
 
-        for col in range(self.N):
-            if self.is_valid_move(state, row, col):
-                self.backtrack(state + [col], row + 1)
+        full = (1 << N) - 1
+        allowed = self.row_masks or [full] * N  # Columns the constraints leave in each row
+        state = list(prefix) + [0] * (N - start)
+        # Occupied columns and diagonals seen by each row, plus the squares still to try
+        cols = [0] * N
+        diag = [0] * N
+        anti_diag = [0] * N
+        avail = [0] * N
+        for row, col in enumerate(prefix):
+            bit = 1 << col
+            cols[row + 1] = cols[row] | bit
+            diag[row + 1] = ((diag[row] | bit) << 1) & full
+            anti_diag[row + 1] = (anti_diag[row] | bit) >> 1
+        row = start
+        avail[row] = allowed[row] & ~(cols[row] | diag[row] | anti_diag[row])
+        if self.symmetry and row <= 1:
+            avail[row] &= self.symmetry_mask(state, row)
+        stats = self.stats
+        if stats is not None:
+            children = avail[row].bit_count()
+            stats.expand(row, children, N - children)
+
+        # Rebuild the stack of a checkpointed path: columns before it are done in every row
+        path = resume[start:] if resume else ()
+        for i, col in enumerate(path):
+            bit = 1 << col
+            if i == len(path) - 1:
+                avail[row] &= ~(bit - 1)  # The path's own column is the next to try
+                break
+            avail[row] &= ~((bit << 1) - 1)
+            state[row] = col
+            cols[row + 1] = cols[row] | bit
+            diag[row + 1] = ((diag[row] | bit) << 1) & full
+            anti_diag[row + 1] = (anti_diag[row] | bit) >> 1
+            row += 1
+            avail[row] = allowed[row] & ~(cols[row] | diag[row] | anti_diag[row])
+            if self.symmetry and row <= 1:
+                avail[row] &= self.symmetry_mask(state, row)
+
+        budget = self.budget
+        while row >= start:
+            free = avail[row]
+            if not free:
+                row -= 1
+                continue
+
+            bit = free & -free  # Lowest free column first, same order as backtrack()
+            if budget is not None and budget.spend() and self.interrupted(state[:row] + [bit.bit_length() - 1]):
+                return
+            avail[row] = free ^ bit
+            state[row] = bit.bit_length() - 1
+
+            if row == N - 1:
+                yield state[:]
+                continue
 
-    def is_valid_move(self, state, row, col):
-        """Check if placing a queen at (row, col) is valid."""
-        for i in range(row):
-            if state[i] == col or abs(state[i] - col) == abs(i - row):
-                return False
-        return True
+            cols[row + 1] = cols[row] | bit
+            diag[row + 1] = ((diag[row] | bit) << 1) & full
+            anti_diag[row + 1] = (anti_diag[row] | bit) >> 1
+            row += 1
+            avail[row] = allowed[row] & ~(cols[row] | diag[row] | anti_diag[row])
+            if self.symmetry and row <= 1:
+                avail[row] &= self.symmetry_mask(state, row)
+            if stats is not None:
+                children = avail[row].bit_count()
+                stats.expand(row, children, N - children)
@@ -1,151 +1,202 @@
 import time
-import os
-from collections import deque
+import numpy as np
 from n_queens_solver import NQueensSolver
-from visualizer import visualize_solution
 
 
 class BFSSolver(NQueensSolver):
-    def __init__(self, N):
-        super().__init__(N)
+    ARRAY_N = 64  # Largest N whose masks fit the uint64 columns of array_search; node_search above
+    LEVEL_CHUNK = 8192  # Nodes expanded (or solutions converted) at a time
+
+    def __init__(self, N, **kwargs):
+        super().__init__(N, **kwargs)
         self.all_solutions = []
+        self.peak_frontier = 0
 
     def solve(self):
         start_time = time.time()
+        self.open_render_queue(f"bfs_solutions_{self.N}")
 
-
-        method_folder = f"bfs_solutions_{self.N}"
-        if not os.path.exists(method_folder):
-            os.makedirs(method_folder)
-
-        # BFS setup: queue starts with an empty board (-1 indicates no queen in a row)
-        queue = deque([[-1] * self.N])  # Initial empty state (list of -1)
-        solutions_found = 0
-
-        while queue:
-            state = queue.popleft()
-
-
-            if self.is_goal_state(state):
-                self.all_solutions.append(state)
-                solution_image_path = f"{method_folder}/solution_{solutions_found}.png"
-                visualize_solution(self.N, state, solution_image_path)  # Save solution image
-                solutions_found += 1
-                continue
-
-
-            for next_state in self.get_possible_next_states(state):
-                queue.append(next_state)
+        for state in self.iter_solutions():
+            self.collect_solution(state)  # Save solution image in the background
 
         exec_time = time.time() - start_time
-        self.metrics.append({
+        solutions_found = self.solutions_found
+        self.metrics.append(self.finish_run(self.add_symmetry_metrics({
             "method": "BFS",
             "time": exec_time,
             "solutions_found": solutions_found,
             "efficiency": solutions_found / exec_time if exec_time > 0 else 0,
-        })
-
-    def is_goal_state(self, state):
-        """Check if the state is a valid solution."""
-        return -1 not in state and self.is_valid_board(state)
-
-    def get_possible_next_states(self, state):
-        """Generate all valid next states by placing a queen in the next row."""
-        next_row = state.index(-1)
-        next_states = []
-
-        for col in range(self.N):
-            if self.is_valid_move(state, next_row, col):
-                new_state = state.copy()
-                new_state[next_row] = col
-                next_states.append(new_state)
-
-        return next_states
-
-    def is_valid_move(self, state, row, col):
-        """Check if placing a queen at (row, col) is valid."""
-        for r in range(row):
-            if state[r] == col or abs(state[r] - col) == abs(r - row):
-                return False
-        return True
-
-    def is_valid_board(self, state):
-        """Check if the entire board configuration is valid (no conflicts)."""
-        for i in range(len(state)):
-            for j in range(i + 1, len(state)):
-                if state[i] == state[j] or abs(state[i] - state[j]) == abs(i - j):
-                    return False
-        return True
+            "peak_frontier": self.peak_frontier,
+        })))
+
+    def generate_solutions(self):
+        """Level-synchronous breadth-first search yielding the solutions of the last level."""
+        if self.N > self.ARRAY_N:
+            return self.node_search()
+        return self.array_search()
+
+    def array_search(self):
+        """BFS over levels stored as parallel NumPy columns instead of one object per node.
+
+        The three masks of every node are columns of the smallest unsigned type that
+        holds N bits and the queens placed so far one uint8 column per row, so the
+        depth of a level is implicit: 3 * 2 + depth bytes per node up to N = 16. Every
+        level is sized by counting the children first and then filled chunk by
+        chunk, node by node and lowest column first, as child_nodes would yield them.
+        """
+        N = self.N
+        dtype = np.uint16 if N <= 16 else np.uint32 if N <= 32 else np.uint64
+        one = dtype(1)
+        full = dtype((1 << N) - 1)
+        shifts = np.arange(N, dtype=dtype)
+        cols = np.zeros(1, dtype=dtype)
+        diag = np.zeros(1, dtype=dtype)
+        anti_diag = np.zeros(1, dtype=dtype)
+        rows = []  # Column of the queen of every row placed so far
+        self.peak_frontier = 1
+
+        stats = self.stats
+        budget = self.budget
+        for depth in range(N):
+            allowed = full if self.row_masks is None else dtype(self.row_masks[depth])
+            if self.symmetry and depth <= 1:
+                allowed = allowed & np.array([self.symmetry_mask([int(row[i]) for row in rows], depth)
+                                              for i in range(len(cols))], dtype=dtype)
+
+            def free_squares(start, stop):
+                """(nodes, N) 0/1 matrix of the free squares of nodes start:stop; row-major is node by node."""
+                free = ~(cols[start:stop] | diag[start:stop] | anti_diag[start:stop])
+                free &= allowed if np.ndim(allowed) == 0 else allowed[start:stop]
+                return (free[:, None] >> shifts) & one
+
+            # First pass: count the children, so that the next level is allocated once
+            size = 0
+            start = 0
+            while start < len(cols):
+                stop = min(len(cols), start + self.LEVEL_CHUNK)
+                if budget is not None:
+                    # Stop exactly where the node-by-node search would check the budget
+                    stop = min(stop, start + max(1, budget.next_check - budget.nodes))
+                    if budget.spend(stop - start) and self.interrupted():
+                        return
+                children = free_squares(start, stop).sum(axis=1)
+                if stats is not None:
+                    stats.expand_many(depth, children, N)
+                size += int(children.sum())
+                start = stop
+
+            next_cols = np.empty(size, dtype=dtype)
+            next_diag = np.empty(size, dtype=dtype)
+            next_anti_diag = np.empty(size, dtype=dtype)
+            next_rows = [np.empty(size, dtype=np.uint8) for _ in range(depth + 1)]
+            offset = 0
+            for start in range(0, len(cols), self.LEVEL_CHUNK):
+                parents, placed = np.nonzero(free_squares(start, start + self.LEVEL_CHUNK))
+                parents += start
+                end = offset + len(parents)
+                bit = one << placed.astype(dtype)
+                next_cols[offset:end] = cols[parents] | bit
+                next_diag[offset:end] = ((diag[parents] | bit) << one) & full
+                next_anti_diag[offset:end] = (anti_diag[parents] | bit) >> one
+                for row, next_row in zip(rows, next_rows):
+                    next_row[offset:end] = row[parents]
+                next_rows[depth][offset:end] = placed
+                offset = end
+            cols, diag, anti_diag, rows = next_cols, next_diag, next_anti_diag, next_rows
+            del next_cols, next_diag, next_anti_diag, next_rows
+            self.peak_frontier = max(self.peak_frontier, size)
+        if stats is not None:
+            stats.frontier(self.peak_frontier)
+
+        for start in range(0, len(cols), self.LEVEL_CHUNK):
+            yield from np.stack([row[start:start + self.LEVEL_CHUNK] for row in rows], axis=1).tolist()
+
+    def node_search(self):
+        """BFS over levels of packed nodes, for boards whose masks do not fit in 64 bits."""
+        # BFS setup: the first level holds only the empty board, as a packed node
+        level = [self.root_node()]
+        self.peak_frontier = 1
+
+        budget = self.budget
+        for _ in range(self.N):
+            # Children are built from the masks, so every node is valid by construction
+            child_nodes = self.child_nodes
+            if budget is None:
+                level = [child for node in level for child in child_nodes(node)]
+            else:
+                next_level = []
+                for node in level:
+                    if budget.spend() and self.interrupted():
+                        return
+                    next_level.extend(child_nodes(node))
+                level = next_level
+            self.peak_frontier = max(self.peak_frontier, len(level))
+        if self.stats is not None:
+            self.stats.frontier(self.peak_frontier)
+
+        for node in level:
+            yield self.unpack_placement(node[4])
 
 
 class DFSSolver(NQueensSolver):
-    def __init__(self, N):
-        super().__init__(N)
+    RESUMABLE = True  # Checkpoint positions are the stack of packed nodes
+
+    def __init__(self, N, workers=None, split_depth=2, **kwargs):
+        super().__init__(N, **kwargs)
+        self.use_workers(workers, split_depth)
         self.all_solutions = []
 
     def solve(self):
         start_time = time.time()
+        self.open_render_queue(f"dfs_solutions_{self.N}")
 
+        for state in self.iter_solutions():
+            self.collect_solution(state)  # Save solution image in the background
 
-        method_folder = f"dfs_solutions_{self.N}"
-        if not os.path.exists(method_folder):
-            os.makedirs(method_folder)
-
-        # DFS setup: stack starts with an empty board
-        stack = [[-1] * self.N]  # Initial empty state (list of -1)
-        solutions_found = 0
+        exec_time = time.time() - start_time
+        solutions_found = self.solutions_found
+        metrics = {
+            "method": "DFS",
+            "time": exec_time,
+            "solutions_found": solutions_found,
+            "efficiency": solutions_found / exec_time if exec_time > 0 else 0,
+        }
+        self.add_symmetry_metrics(metrics)
+        if self.worker_metrics is not None:
+            metrics["method"] = "DFS (parallel)"
+            metrics["workers"] = self.worker_metrics
+        self.metrics.append(self.finish_run(metrics))
+
+    def generate_solutions(self):
+        """Yield every solution, splitting the tree over a process pool when workers > 1."""
+        self.worker_metrics = None
+        if self.workers and self.workers > 1:
+            # Serial DFS pops the highest column first, so the prefixes are merged in reverse
+            return self.parallel_solutions("search", reverse=True)
+        return self.search(resume=self.resume_position)
+
+    def search(self, prefix=(), resume=None):
+        """Depth-first search yielding every solution that extends the given prefix.
+
+        `resume` is a checkpointed stack to continue from instead.
+        """
+        # DFS setup: stack starts with the prefix as a packed node
+        stack = [tuple(node) for node in resume] if resume else [self.root_node(prefix)]
+        N = self.N
+        stats = self.stats
+        budget = self.budget
 
         while stack:
-            state = stack.pop()
+            if stats is not None:
+                stats.frontier(len(stack))
+            if budget is not None and budget.spend() and self.interrupted(stack):
+                return
+            node = stack.pop()
 
 
-            if self.is_goal_state(state):
-                self.all_solutions.append(state)
-                solution_image_path = f"{method_folder}/solution_{solutions_found}.png"
-                visualize_solution(self.N, state, solution_image_path)  # Save solution image
-                solutions_found += 1
+            if node[3] == N:
+                yield self.unpack_placement(node[4])  # Valid by construction
                 continue
 
 
-            for next_state in self.get_possible_next_states(state):
-                stack.append(next_state)
-
-        exec_time = time.time() - start_time
-        self.metrics.append({
-            "method": "DFS",
-            "time": exec_time,
-            "solutions_found": solutions_found,
-            "efficiency": solutions_found / exec_time if exec_time > 0 else 0,
-        })
-
-    def is_goal_state(self, state):
-        """Check if the state is a valid solution."""
-        return -1 not in state and self.is_valid_board(state)
-
-    def get_possible_next_states(self, state):
-        """Generate all valid next states by placing a queen in the next row."""
-        next_row = state.index(-1)
-        next_states = []
-
-        for col in range(self.N):
-            if self.is_valid_move(state, next_row, col):
-                new_state = state.copy()
-                new_state[next_row] = col
-                next_states.append(new_state)
-
-        return next_states
-
-    def is_valid_move(self, state, row, col):
-        """Check if placing a queen at (row, col) is valid."""
-        for r in range(row):
-            if state[r] == col or abs(state[r] - col) == abs(r - row):  # Same column or diagonal
-                return False
-        return True
-
-    def is_valid_board(self, state):
-        """Check if the entire board configuration is valid (no conflicts)."""
-        for i in range(len(state)):
-            for j in range(i + 1, len(state)):
-                if state[i] == state[j] or abs(state[i] - state[j]) == abs(i - j):
-                    return False
-        return True
+            stack.extend(self.child_nodes(node))
@@ -1,48 +1,62 @@
 import time
-import os
-from itertools import permutations
+from itertools import islice, permutations
 from n_queens_solver import NQueensSolver
-from visualizer import visualize_solution
 
 
 class BruteForceSolver(NQueensSolver):
-    def __init__(self, N):
-        super().__init__(N)
+    RESUMABLE = True  # Checkpoint positions are indexes into candidate_permutations()
+
+    def __init__(self, N, **kwargs):
+        super().__init__(N, **kwargs)
         self.all_solutions = []
 
     def solve(self):
         start_time = time.time()
+        self.open_render_queue(f"brute_force_solutions_{self.N}")
 
-        method_folder = f"brute_force_solutions_{self.N}"
-        if not os.path.exists(method_folder):
-            os.makedirs(method_folder)
-
-        for perm in permutations(range(self.N)):
-            if self.is_goal_state(perm):
-                # Save solution image
-                solution_image_path = f"{method_folder}/solution_{len(self.all_solutions)}.png"
-                visualize_solution(self.N, perm, solution_image_path)
-
-                self.all_solutions.append(perm)
+        for perm in self.iter_solutions():
+            # Save solution image in the background
+            self.collect_solution(perm)
 
         exec_time = time.time() - start_time
-        self.metrics.append({
+        solutions_found = self.solutions_found
+        self.metrics.append(self.finish_run(self.add_symmetry_metrics({
             "method": "Brute Force",
             "time": exec_time,
-            "iterations": len(self.all_solutions),
-            "efficiency": len(self.all_solutions) / exec_time if exec_time > 0 else 0,
-            "solutions_found": len(self.all_solutions)
-        })
-
-    def is_goal_state(self, state):
-        """Check if the state is a valid solution (no attacking queens)."""
-        return self.compute_reward(state) == 0
-
-    def compute_reward(self, state):
-        """Compute the reward for a given state (lower is better)."""
-        conflicts = 0
-        for i in range(self.N):
-            for j in range(i + 1, self.N):
-                if abs(state[i] - state[j]) == abs(i - j):  # Diagonal conflict
-                    conflicts += 1
-        return conflicts
+            "iterations": solutions_found,
+            "efficiency": solutions_found / exec_time if exec_time > 0 else 0,
+            "solutions_found": solutions_found
+        })))
+
+    def generate_solutions(self):
+        """Check every candidate permutation and yield the valid ones."""
+        stats = self.stats
+        budget = self.budget
+        start = self.resume_position or 0
+        for index, perm in enumerate(islice(self.candidate_permutations(), start, None), start):
+            if budget is not None and budget.spend() and self.interrupted(index):
+                return
+            if self.is_goal_state(perm):
+                if stats is not None:
+                    stats.visit()
+                yield perm
+            elif stats is not None:
+                stats.visit(1, 1)
+
+    def candidate_permutations(self):
+        """All column permutations, in lexicographic order, allowed by candidate_columns."""
+        if self.row_masks is not None:
+            masks = self.row_masks
+            yield from (perm for perm in permutations(range(self.N))
+                        if all(masks[row] >> col & 1 for row, col in enumerate(perm)))
+            return
+        if not self.symmetry or self.N < 2:
+            yield from permutations(range(self.N))
+            return
+
+        for first in self.candidate_columns((), 0):
+            rest = [col for col in range(self.N) if col != first]
+            second_columns = self.candidate_columns((first,), 1)
+            for perm in permutations(rest):
+                if perm[0] in second_columns:
+                    yield (first,) + perm
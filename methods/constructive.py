@@ -0,0 +1,101 @@
+import time
+import numpy as np
+from n_queens_solver import NQueensSolver
+
+
+def construct_board(N, out=None):
+    """Explicit solution for N (columns per row), written into `out` if given; None for N = 2, 3.
+
+    The staircase construction by N mod 6: the even columns then the odd ones
+    (1-based), with a few columns moved when N mod 6 is 2 or 3. `out` can be any
+    preallocated integer array of length N (e.g. a np.memmap for huge N), which
+    avoids building the board in memory first.
+    """
+    if N in (2, 3):
+        return None
+    if out is None:
+        out = np.empty(N, dtype=np.int64 if N > 2 ** 31 else np.int32)
+    if len(out) != N:
+        raise ValueError(f"Output array has length {len(out)}, expected {N}")
+    if N == 1:
+        out[0] = 0
+        return out
+
+    # 0-based columns: "even" columns are 1, 3, 5, ... and "odd" ones 0, 2, 4, ...
+    evens = N // 2
+    if N % 6 == 3:
+        out[:evens - 1] = np.arange(3, N, 2)  # 4, 6, ..., N - 1 then 2
+        out[evens - 1] = 1
+    else:
+        out[:evens] = np.arange(1, N, 2)
+    odds = out[evens:]
+    if N % 6 == 2:
+        odds[:2] = (2, 0)  # 3, 1, 7, 9, ..., N - 1 then 5
+        odds[2:-1] = np.arange(6, N, 2)
+        odds[-1] = 4
+    elif N % 6 == 3:
+        odds[:-2] = np.arange(4, N, 2)  # 5, 7, ..., N then 1, 3
+        odds[-2:] = (0, 2)
+    else:
+        odds[:] = np.arange(0, N, 2)
+    return out
+
+
+def validate_board(state):
+    """O(N) check of a board given as one column per row: no two queens share a column or diagonal."""
+    state = np.asarray(state, dtype=np.int64)
+    N = len(state)
+    if N == 0 or state.min() < 0 or state.max() >= N:
+        return N == 0
+    rows = np.arange(N)
+    for lines, size in ((state, N), (rows - state + N - 1, 2 * N - 1), (rows + state, 2 * N - 1)):
+        if np.bincount(lines, minlength=size).max() > 1:
+            return False
+    return True
+
+
+class ConstructiveSolver(NQueensSolver):
+    """Writes down one solution in O(N) from a closed-form construction, no search involved.
+
+    Meant for single-solution queries, including N far beyond any search; the
+    board is checked with the O(N) validate_board before it is reported.
+    """
+    EXHAUSTIVE = False
+    CONSTRAINABLE = False
+
+    def __init__(self, N, out=None, validate=True, render="off", **kwargs):
+        super().__init__(N, render=render, **kwargs)  # Off by default: N is usually far too big to draw
+        self.out = out  # Preallocated array for the board, e.g. a np.memmap
+        self.validate = validate
+        self.all_solutions = []
+        self.valid = None
+
+    def solve(self):
+        start_time = time.time()
+        self.open_render_queue(f"constructive_solutions_{self.N}")
+
+        for state in self.iter_solutions():
+            self.collect_solution(state)
+
+        exec_time = time.time() - start_time
+        self.metrics.append(self.finish_run({
+            "method": "Constructive",
+            "time": exec_time,
+            "iterations": self.N,
+            "valid": self.valid,
+            "efficiency": self.solutions_found / exec_time if exec_time > 0 else 0,
+            "solutions_found": self.solutions_found
+        }))
+
+    def generate_solutions(self):
+        """Yield the constructed board (a NumPy array, or `out`), none for N = 2 and 3."""
+        board = construct_board(self.N, self.out)
+        if board is None:
+            return
+        if self.stats is not None:
+            self.stats.visit(self.N)
+        if self.validate:
+            self.valid = validate_board(board)
+            if not self.valid:
+                raise RuntimeError(f"Construction produced an invalid board for N={self.N}")
+        yield board
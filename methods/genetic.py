@@ -1,73 +1,359 @@
+import multiprocessing
+import queue
 import random
 import time
-import os
+import numpy as np
 from n_queens_solver import NQueensSolver
-from visualizer import visualize_solution  # Assuming you have a function for visualizing solutions
+from symmetry import DedupIndex, canonical_form, canonical_key
+
+
+def run_island(index, N, settings, inbox, outbox, stop, seed):
+    """Process entry point of one island: evolve a population and talk to the coordinator.
+
+    Sends ("found", index, boards) for boards not known yet, ("migrants", index,
+    best boards, individuals evaluated) every migration interval and
+    ("done", index, generations run) at the end. Receives the canonical forms
+    keys of the boards found elsewhere and immigrants, which replace the island's
+    worst individuals.
+    """
+    random.seed(seed)
+    solver = GeneticSolver(N, render="off", **settings)
+    population = [solver.random_state() for _ in range(solver.population_size)]
+    known = solver.all_solutions  # Symmetry classes found by any island
+    evaluated = 0
+    generation = 0
+    for generation in range(solver.generations):
+        if stop.is_set():
+            break
+        population = solver.next_generation(population, generation)
+        evaluated += len(population)
+
+        while True:
+            try:
+                kind, payload = inbox.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "found":
+                known.update_keys(payload)
+            else:
+                population = sorted(population, key=solver.evaluate)[:len(population) - len(payload)] + payload
+
+        found = []
+        for i, state in enumerate(population):
+            if solver.is_goal_state(state):
+                if known.add(state):
+                    found.append(state)
+                population[i] = solver.random_state()  # Known boards only take up room
+        if found:
+            outbox.put(("found", index, found))
+
+        if generation % solver.migration_interval == 0:
+            best = sorted(population, key=solver.evaluate)[:solver.migrants]
+            outbox.put(("migrants", index, best, evaluated))
+            evaluated = 0
+
+        solver.fitness = {state: solver.fitness[state] for state in population if state in solver.fitness}
+    outbox.put(("done", index, generation + 1))
+
 
 class GeneticSolver(NQueensSolver):
-    def __init__(self, N, population_size=100, generations=1000, mutation_rate=0.01):
-        super().__init__(N)
+    EXHAUSTIVE = False
+    CONSTRAINABLE = False
+    BACKENDS = ("python", "numpy")
+    TOPOLOGIES = ("ring", "full", "random")
+
+    def __init__(self, N, population_size=100, generations=1000, mutation_rate=0.01, backend="python",
+                 islands=1, migration_interval=20, migrants=2, topology="ring", **kwargs):
+        super().__init__(N, **kwargs)
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown genetic backend: {backend!r}")
+        if topology not in self.TOPOLOGIES:
+            raise ValueError(f"Unknown migration topology: {topology!r}")
+        if islands > 1 and backend != "python":
+            raise ValueError("Island mode runs the python backend")
+        self.backend = backend
         self.population_size = population_size
         self.generations = generations
         self.mutation_rate = mutation_rate
-        self.all_solutions = set()
+        # Island model: independent populations in separate processes exchanging their best boards
+        self.islands = islands
+        self.migration_interval = migration_interval
+        self.migrants = migrants
+        self.topology = topology
+        self.migrations = 0
+        self.all_solutions = DedupIndex(N)  # Canonical keys of the symmetry classes found
+        # Memoized [conflicts, diagonal counts, anti-diagonal counts] of the current population
+        self.fitness = {}
 
     def solve(self):
         start_time = time.time()
+        render_queue = self.open_render_queue(f"genetic_solutions_{self.N}")
+
+        for state in self.iter_solutions():
+            render_queue.submit(state)
 
+        exec_time = time.time() - start_time
+        metrics = {
+            "method": "Genetic" if self.backend == "python" else "Genetic (numpy)",
+            "time": exec_time,
+            "iterations": len(self.all_solutions),
+            "efficiency": len(self.all_solutions) / exec_time if exec_time > 0 else 0,
+            "solutions_found": len(self.all_solutions)
+        }
+        if self.islands > 1:
+            metrics["method"] = f"Genetic ({self.islands} islands, {self.topology})"
+            metrics["migrations"] = self.migrations
+        self.metrics.append(self.finish_run(metrics))
 
-        method_folder = f"genetic_solutions_{self.N}"
-        if not os.path.exists(method_folder):
-            os.makedirs(method_folder)
+    def generate_solutions(self):
+        """Evolve the population and yield every solution the first time its symmetry class shows up."""
+        if self.backend == "numpy":
+            yield from self.generate_solutions_numpy()
+            return
+        if self.islands > 1:
+            yield from self.island_search()
+            return
 
         population = [self.random_state() for _ in range(self.population_size)]
+        expected_count = self.expected_solutions_count()
+
+        budget = self.budget
+        for generation in range(self.generations):
+            if budget is not None and budget.spend(len(population)) and self.interrupted():
+                return
+
+            population = self.next_generation(population, generation)
+            if self.stats is not None:
+                self.stats.visit(len(population))
+                self.stats.frontier(len(population))
+
+
+            for state in population:
+                if self.is_goal_state(state) and self.all_solutions.add(state):
+                    yield state
+
+            # Forget the fitness of individuals that did not make it into this generation
+            self.fitness = {state: self.fitness[state] for state in population if state in self.fitness}
+
+            # Stop if all solutions are found (only known when the count is)
+            if expected_count and len(self.all_solutions) == expected_count:
+                break
+
+            # Adjust mutation rate if progress is slow
+            if generation % 100 == 0 and len(self.all_solutions) < expected_count // 2:
+                self.mutation_rate = min(self.mutation_rate * 1.5, 0.1)
 
+    def next_generation(self, population, generation):
+        """Selection, crossover, mutation and random diversity for one generation."""
+        # Evaluate population (survivors keep their memoized fitness)
+        population = sorted(population, key=self.evaluate)
+        new_population = population[:self.population_size // 2]
+
+        # Crossover
+        for i in range(self.population_size // 2):
+            parent1, parent2 = random.sample(new_population, 2)
+            child = self.crossover(parent1, parent2)
+            new_population.append(child)
+
+        # Mutation
+        for i in range(self.population_size // 2, self.population_size):
+            if random.random() < self.mutation_rate:
+                new_population[i] = self.mutate(new_population[i])
+
+        # Add random diversity every 10 generations
+        if generation % 10 == 0:
+            new_population += [self.random_state() for _ in range(self.population_size // 5)]
+
+        return new_population
+
+    def island_search(self):
+        """Run the islands in separate processes and yield solutions as any island finds them.
+
+        This process keeps the global DedupIndex: the key of every new board is
+        broadcast so the other islands stop looking for it, and migrants are routed
+        along the topology. All islands stop once the expected count is reached.
+        """
+        settings = {"population_size": self.population_size, "generations": self.generations,
+                    "mutation_rate": self.mutation_rate, "migration_interval": self.migration_interval,
+                    "migrants": self.migrants}
+        expected_count = self.expected_solutions_count()
+        outbox = multiprocessing.Queue()
+        inboxes = [multiprocessing.Queue() for _ in range(self.islands)]
+        stop = multiprocessing.Event()
+        processes = [multiprocessing.Process(target=run_island, daemon=True,
+                                             args=(i, self.N, settings, inboxes[i], outbox, stop,
+                                                   random.getrandbits(64)))
+                     for i in range(self.islands)]
+        for process in processes:
+            process.start()
+
+        self.migrations = 0
+        running = self.islands
+        try:
+            while running:
+                if self.budget is not None and self.interrupted():
+                    break
+                try:
+                    message = outbox.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                kind, index = message[0], message[1]
+                if kind == "done":
+                    running -= 1
+                elif kind == "migrants":
+                    _, _, best, evaluated = message
+                    if self.budget is not None:
+                        self.budget.spend(evaluated)
+                    if self.stats is not None:
+                        self.stats.visit(evaluated)
+                    for target in self.migration_targets(index):
+                        inboxes[target].put(("migrants", best))
+                        self.migrations += 1
+                else:
+                    new = []
+                    for state in message[2]:
+                        key = canonical_key(state)
+                        if self.all_solutions.add_key(key):
+                            new.append(key)
+                            yield state
+                    for i, inbox in enumerate(inboxes):
+                        if i != index and new:
+                            inbox.put(("found", new))
+                    if expected_count and len(self.all_solutions) == expected_count:
+                        break
+        finally:
+            stop.set()
+            for inbox in inboxes:
+                inbox.cancel_join_thread()  # Islands that already stopped never drain theirs
+            # Keep draining the outbox so no island blocks on flushing its last messages
+            deadline = time.time() + 5
+            while any(process.is_alive() for process in processes) and time.time() < deadline:
+                try:
+                    outbox.get(timeout=0.05)
+                except queue.Empty:
+                    pass
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+
+    def migration_targets(self, index):
+        """Islands that receive the migrants of island `index`."""
+        if self.topology == "ring":
+            return [(index + 1) % self.islands]
+        if self.topology == "full":
+            return [i for i in range(self.islands) if i != index]
+        return [random.choice([i for i in range(self.islands) if i != index])]
+
+    def generate_solutions_numpy(self):
+        """Same evolution as generate_solutions, on a (pop_size, N) array with batched operators."""
+        rng = np.random.default_rng(random.getrandbits(64))  # Follows random.seed()
+        half = self.population_size // 2
+        population = self.random_population(rng, self.population_size)
+        expected_count = self.expected_solutions_count()
+
+        budget = self.budget
         for generation in range(self.generations):
+            if budget is not None and budget.spend(len(population)) and self.interrupted():
+                return
+
             # Evaluate population
-            population = sorted(population, key=lambda state: self.compute_reward(state))
-            new_population = population[:self.population_size // 2]
+            fitness = self.batch_fitness(population)
+            parents = population[np.argsort(fitness, kind="stable")[:half]]
 
             # Crossover
-            for i in range(self.population_size // 2):
-                parent1, parent2 = random.sample(new_population, 2)
-                child = self.crossover(parent1, parent2)
-                new_population.append(child)
+            children = self.batch_crossover(rng, parents, half)
 
             # Mutation
-            for i in range(self.population_size // 2, self.population_size):
-                if random.random() < self.mutation_rate:
-                    new_population[i] = self.mutate(new_population[i])
+            mutating = rng.random(len(children)) < self.mutation_rate
+            children[mutating] = self.batch_mutate(rng, children[mutating])
+
+            population = np.concatenate([parents, children])
 
             # Add random diversity every 10 generations
             if generation % 10 == 0:
-                new_population += [self.random_state() for _ in range(self.population_size // 5)]
+                population = np.concatenate([population, self.random_population(rng, self.population_size // 5)])
+            if self.stats is not None:
+                self.stats.visit(len(population))
+                self.stats.frontier(len(population))
 
-            population = new_population
 
+            solutions = population[self.batch_fitness(population) == 0]
+            for state in solutions[self.all_solutions.add_batch(solutions)]:
+                yield tuple(int(col) for col in state)
 
-            for state in population:
-                canonical_state = self.canonical_form(state)
-                if self.is_goal_state(state) and canonical_state not in self.all_solutions:
-                    self.all_solutions.add(canonical_state)
-                    solution_image_path = f"{method_folder}/solution_{len(self.all_solutions) - 1}.png"
-                    visualize_solution(self.N, state, solution_image_path)
-
-            # Stop if all solutions are found
-            if len(self.all_solutions) == self.expected_solutions_count():
+            # Stop if all solutions are found (only known when the count is)
+            if expected_count and len(self.all_solutions) == expected_count:
                 break
 
             # Adjust mutation rate if progress is slow
-            if generation % 100 == 0 and len(self.all_solutions) < self.expected_solutions_count() // 2:
+            if generation % 100 == 0 and len(self.all_solutions) < expected_count // 2:
                 self.mutation_rate = min(self.mutation_rate * 1.5, 0.1)
 
-        exec_time = time.time() - start_time
-        self.metrics.append({
-            "method": "Genetic",
-            "time": exec_time,
-            "iterations": len(self.all_solutions),
-            "efficiency": len(self.all_solutions) / exec_time if exec_time > 0 else 0,
-            "solutions_found": len(self.all_solutions)
-        })
+    def random_population(self, rng, size):
+        """`size` random permutations as a (size, N) array."""
+        return np.argsort(rng.random((size, self.N)), axis=1)
+
+    def batch_fitness(self, population):
+        """compute_reward of every row at once from per-row diagonal histograms."""
+        size, N = population.shape
+        rows = np.arange(N)
+        offsets = (np.arange(size) * (2 * N - 1))[:, None]
+        diag = np.bincount((rows - population + N - 1 + offsets).ravel(), minlength=size * (2 * N - 1))
+        anti_diag = np.bincount((rows + population + offsets).ravel(), minlength=size * (2 * N - 1))
+        pairs = diag * (diag - 1) // 2 + anti_diag * (anti_diag - 1) // 2
+        return pairs.reshape(size, 2 * N - 1).sum(axis=1)
+
+    def batch_crossover(self, rng, parents, count):
+        """One-point crossover of `count` random parent pairs, repaired into permutations."""
+        size, N = parents.shape
+        first = rng.integers(0, size, count)
+        second = (first + rng.integers(1, size, count)) % size  # Two different parents
+        points = rng.integers(1, N, count)
+        take_first = np.arange(N) < points[:, None]
+        children = self.batch_fix_states(rng, np.where(take_first, parents[first], parents[second]))
+
+        # Children too close to a parent are replaced by random ones, as in crossover()
+        similarity = np.maximum((children == parents[first]).mean(axis=1), (children == parents[second]).mean(axis=1))
+        too_similar = similarity > 0.8
+        children[too_similar] = self.random_population(rng, int(too_similar.sum()))
+        return children
+
+    def batch_fix_states(self, rng, states):
+        """Vectorized fix_state: replace repeated columns by the missing ones in random order."""
+        size, N = states.shape
+        row_index = np.arange(size)[:, None]
+
+        # A position is a duplicate if the same column already appeared earlier in the row
+        order = np.argsort(states, axis=1, kind="stable")
+        sorted_states = np.take_along_axis(states, order, axis=1)
+        duplicate_sorted = np.zeros((size, N), dtype=bool)
+        duplicate_sorted[:, 1:] = sorted_states[:, 1:] == sorted_states[:, :-1]
+        duplicate = np.zeros((size, N), dtype=bool)
+        duplicate[row_index, order] = duplicate_sorted
+
+        present = np.zeros((size, N), dtype=bool)
+        present[row_index, states] = True
+
+        # Line up the k duplicate positions of a row with its k missing columns (shuffled)
+        duplicate_positions = np.argsort(~duplicate, axis=1, kind="stable")
+        missing_columns = np.argsort(np.where(present, 2.0, rng.random((size, N))), axis=1)
+        slots = np.arange(N) < duplicate.sum(axis=1)[:, None]
+        fixed = states.copy()
+        fixed[np.broadcast_to(row_index, (size, N))[slots], duplicate_positions[slots]] = missing_columns[slots]
+        return fixed
+
+    def batch_mutate(self, rng, states):
+        """Swap two random queens in every row."""
+        size, N = states.shape
+        if not size:
+            return states
+        i = rng.integers(0, N, size)
+        j = (i + rng.integers(1, N, size)) % N
+        rows = np.arange(size)
+        mutated = states.copy()
+        mutated[rows, i], mutated[rows, j] = states[rows, j], states[rows, i]
+        return mutated
 
     def random_state(self):
         """Generate a random state for the population."""
@@ -85,11 +371,13 @@ class GeneticSolver(NQueensSolver):
         return tuple(child)
 
     def mutate(self, state):
-        """Mutate a given state by randomly swapping two queens."""
-        state = list(state)
-        i, j = random.sample(range(self.N), 2)
-        state[i], state[j] = state[j], state[i]
-        return tuple(state)
+        """Mutate a given state by randomly swapping two queens; the child is re-scored in O(1)."""
+        self.evaluate(state)
+        board = self.fitness[state].copy()
+        board.swap(*random.sample(range(self.N), 2))
+        child = tuple(board.queens)
+        self.fitness[child] = board
+        return child
 
     def fix_state(self, state):
         """Ensure the state is a valid permutation (no duplicate columns)."""
@@ -104,12 +392,7 @@ class GeneticSolver(NQueensSolver):
 
     def canonical_form(self, state):
         """Returns a canonical representation of the solution to handle symmetric solutions."""
-        rotations = [state]
-        for _ in range(3):
-            state = tuple(state.index(i) for i in range(len(state)))
-            rotations.append(state)
-        reflections = [tuple(reversed(r)) for r in rotations]
-        return min(rotations + reflections)
+        return canonical_form(state)
 
     def compute_similarity(self, state1, state2):
         """Compute similarity between two states."""
@@ -117,20 +400,22 @@ class GeneticSolver(NQueensSolver):
 
     def is_goal_state(self, state):
         """Check if the state is a valid solution (no attacking queens)."""
-        return self.compute_reward(state) == 0
+        return self.evaluate(state) == 0
 
-    def compute_reward(self, state):
-        """Compute the reward for a given state (lower is better)."""
-        conflicts = 0
-        for i in range(self.N):
-            for j in range(i + 1, self.N):
-                if abs(state[i] - state[j]) == abs(i - j):  # Diagonal conflict
-                    conflicts += 1
-        return conflicts
+    def evaluate(self, state):
+        """Memoized compute_reward that also keeps the BoardState for mutate()."""
+        board = self.fitness.get(state)
+        if board is None:
+            board = self.fitness[state] = self.board_state(state)
+        return board.conflicts
 
     def expected_solutions_count(self):
         """Calculate the number of unique solutions for N-Queens."""
-        # Precomputed number of unique solutions for known N values
-        precomputed_solutions = {1: 1, 4: 2, 8: 92, 10: 724, 12: 14200}
-        return precomputed_solutions.get(self.N, 0)  # Default to 0 if not precomputed
+        # Any N enumerated once by an exhaustive solver is in the solution cache, if we were given one
+        cached_count = self.cache.fundamental_count(self.N) if self.cache is not None else None
+        if cached_count is not None:
+            return cached_count
 
+        # Precomputed number of unique (up to symmetry, like canonical_form) solutions for known N values
+        precomputed_solutions = {1: 1, 4: 1, 8: 12, 10: 92, 12: 1787}
+        return precomputed_solutions.get(self.N, 0)  # Default to 0 if not precomputed
@@ -0,0 +1,126 @@
+import random
+import time
+from n_queens_solver import BoardState, NQueensSolver
+
+
+class MinConflictsSolver(NQueensSolver):
+    """Finds one placement with greedy initialization and min-conflicts swap repair.
+
+    The board is a permutation (one queen per row and column), so only the
+    diagonals can conflict; a BoardState keeps their counters and scores swaps in O(1).
+    """
+    EXHAUSTIVE = False
+    CONSTRAINABLE = False
+
+    def __init__(self, N, max_restarts=200, max_steps=None, free_tail=32, sideways=0.1, render="off", **kwargs):
+        super().__init__(N, render=render, **kwargs)  # Off by default: N is usually far too big to draw
+        self.max_restarts = max_restarts
+        self.sideways = sideways  # Chance of taking a swap that keeps the conflict count
+        self.max_steps = max_steps if max_steps is not None else 10 * N + 1000
+        self.free_tail = free_tail
+        self.all_solutions = []
+        self.steps = 0
+        self.restarts = 0
+
+    def solve(self):
+        start_time = time.time()
+        self.open_render_queue(f"min_conflicts_solutions_{self.N}")
+
+        for state in self.iter_solutions():
+            self.collect_solution(state)
+
+        exec_time = time.time() - start_time
+        self.metrics.append(self.finish_run({
+            "method": "Min-Conflicts",
+            "time": exec_time,
+            "iterations": self.steps,
+            "restarts": self.restarts,
+            "efficiency": self.solutions_found / exec_time if exec_time > 0 else 0,
+            "solutions_found": self.solutions_found
+        }))
+
+    def generate_solutions(self):
+        """Yield a single solution, restarting from a new placement when repair stalls."""
+        if self.N in (2, 3):
+            return
+        self.steps = 0
+        for self.restarts in range(self.max_restarts):
+            board = self.initial_placement()
+            if self.repair(board):
+                yield board.queens
+                return
+            if self.status != "complete":
+                return  # Out of budget, not just a stalled repair
+
+    def initial_placement(self):
+        """Greedy permutation: each row takes a random remaining column on free diagonals if it can.
+
+        The permutation is built in place in the counters of a BoardState, which is returned.
+        """
+        N = self.N
+        board = BoardState(N)
+        state, diag, anti_diag = board.queens, board.diag, board.anti_diag
+        state[:] = range(N)
+        randrange = random.randrange
+
+        for row in range(N):
+            if row < N - self.free_tail:
+                # A few random picks find a free square quickly while most columns are still free
+                for _ in range(N - row):
+                    j = randrange(row, N)
+                    col = state[j]
+                    if not diag[row - col + N - 1] and not anti_diag[row + col]:
+                        break
+            else:
+                j = randrange(row, N)  # The last rows are left to the repair phase
+            state[row], state[j] = state[j], state[row]
+            col = state[row]
+            diag[row - col + N - 1] += 1
+            anti_diag[row + col] += 1
+
+        board.cols = [1] * N
+        board.conflicts = board.count_conflicts()
+        return board
+
+    def repair(self, board):
+        """Swap queens out of conflicted rows while it lowers (or, sometimes, keeps) the conflict count."""
+        N = self.N
+        state, diag, anti_diag = board.queens, board.diag, board.anti_diag
+        randrange = random.randrange
+        rand = random.random
+        swap = board.swap
+
+        def is_conflicted(row):
+            return diag[row - state[row] + N - 1] > 1 or anti_diag[row + state[row]] > 1
+
+        # Every attacking pair keeps at least one of its rows on this stack
+        suspects = [row for row in range(N) if is_conflicted(row)]
+        steps = 0
+        rejected = 0
+        budget = self.budget
+        while board.conflicts:
+            if steps > self.max_steps or (budget is not None and budget.spend() and self.interrupted()):
+                self.record_steps(steps, rejected)
+                return False
+            i = suspects[-1]
+            if not is_conflicted(i):
+                suspects.pop()
+                continue
+            j = randrange(N)
+            steps += 1
+            if i == j:
+                continue
+            delta = swap(i, j)
+            if delta < 0 or (delta == 0 and rand() < self.sideways):
+                suspects.append(j)
+            else:
+                swap(i, j)  # Undo
+                rejected += 1
+        self.record_steps(steps, rejected)
+        return True
+
+    def record_steps(self, steps, rejected):
+        """Add the swaps tried by one repair (and how many were undone) to the counters."""
+        self.steps += steps
+        if self.stats is not None:
+            self.stats.visit(steps, rejected)
@@ -1,102 +1,167 @@
 import random
 import time
-import os
+from collections import OrderedDict
 import numpy as np
 from n_queens_solver import NQueensSolver
-from visualizer import visualize_solution  # Assuming you have a function for visualizing solutions
 
-class ReinforcementSolver(NQueensSolver):
-    def __init__(self, N, alpha=0.1, gamma=0.9, epsilon=0.1, episodes=1000):
-        super().__init__(N)
-        self.alpha = alpha
-        self.gamma = gamma
-        self.epsilon = epsilon
-        self.episodes = episodes
-        self.q_table = {}
-        self.all_solutions = []
-
-    def solve(self):
-        start_time = time.time()
 
+class QTable:
+    """Array-backed Q-table that only stores visited states and evicts the least recently used."""
 
-        method_folder = f"reinforcement_solutions_{self.N}"
-        if not os.path.exists(method_folder):
-            os.makedirs(method_folder)
+    def __init__(self, actions, capacity):
+        self.capacity = capacity
+        self.values = np.zeros((capacity, actions), dtype=np.float32)
+        self.slots = OrderedDict()  # state key -> row of self.values, oldest first
+        self.evictions = 0
 
+    def __len__(self):
+        return len(self.slots)
 
-        for state in self.get_all_possible_states():
-            self.q_table[state] = [0] * self.N
+    def row(self, key):
+        """Q-values of a state, or None if it was never visited (nothing is allocated)."""
+        slot = self.slots.get(key)
+        return None if slot is None else self.values[slot]
 
-        total_rewards = []
-        for episode in range(self.episodes):
-            state = self.random_initial_state()
-            total_reward = 0
+    def slot(self, key):
+        """Row index of a state, allocating (or recycling the least recently used row) on first visit."""
+        slot = self.slots.get(key)
+        if slot is not None:
+            self.slots.move_to_end(key)
+            return slot
+        if len(self.slots) < self.capacity:
+            slot = len(self.slots)
+        else:
+            _, slot = self.slots.popitem(last=False)
+            self.values[slot] = 0
+            self.evictions += 1
+        self.slots[key] = slot
+        return slot
 
-            while not self.is_goal_state(state):
-                if random.random() < self.epsilon:
-                    action = random.randint(0, self.N - 1)  # Explore
-                else:
-                    action = self.get_best_action(state)  # Exploit
 
-                next_state = self.apply_action(state, action)
-                reward = self.compute_reward(next_state)
-
-                best_next_action = self.get_best_action(next_state)
-                self.q_table[state][action] += self.alpha * (
-                    reward + self.gamma * self.q_table[next_state][best_next_action] - self.q_table[state][action])
+class ReinforcementSolver(NQueensSolver):
+    """Q-learning over row-by-row placements: each action puts the next queen on a free square.
 
-                state = next_state
-                total_reward += reward
+    Reaching a row with no free square ends the episode with a penalty and a full board is rewarded.
+    """
+    EXHAUSTIVE = False
 
-                if self.is_goal_state(state):
+    def __init__(self, N, alpha=0.1, gamma=0.9, epsilon=0.1, episodes=1000, batch_size=32,
+                 max_states=100000, **kwargs):
+        super().__init__(N, **kwargs)
+        self.alpha = alpha
+        self.gamma = gamma
+        self.epsilon = epsilon
+        self.episodes = episodes
+        self.batch_size = batch_size
+        self.q_table = QTable(N, max_states)
+        self.all_solutions = []
 
-                    solution_image_path = f"{method_folder}/solution_{len(self.all_solutions)}.png"
-                    visualize_solution(self.N, state, solution_image_path)
-                    print(f"Solution found: {state}")
-                    self.all_solutions.append(state)
-                    break
+    def solve(self):
+        start_time = time.time()
+        self.open_render_queue(f"reinforcement_solutions_{self.N}")
 
-            total_rewards.append(total_reward)
+        for state in self.iter_solutions():
+            print(f"Solution found: {state}")
+            self.collect_solution(state)
 
         exec_time = time.time() - start_time
-        self.metrics.append({
+        self.metrics.append(self.finish_run({
             "method": "Reinforcement Learning",
             "time": exec_time,
             "iterations": self.episodes,
-            "efficiency": len(self.all_solutions) / exec_time if exec_time > 0 else 0,
-            "solutions_found": len(self.all_solutions)
-        })
-
-    def random_initial_state(self):
-        """Generate a random initial state."""
-        return tuple(random.sample(range(self.N), self.N))
-
-    def get_all_possible_states(self):
-        """Generate all possible states of the N-Queens problem."""
-        return [tuple(p) for p in itertools.permutations(range(self.N))]
-
-    def is_goal_state(self, state):
-        """Check if the state is a valid solution."""
-        return self.compute_reward(state) == 0
-
-    def compute_reward(self, state):
-        """Compute the reward for a given state (lower is better)."""
-        conflicts = 0
-        for i in range(self.N):
-            for j in range(i + 1, self.N):
-                if abs(state[i] - state[j]) == abs(i - j):
-                    conflicts += 1
-        return conflicts
-
-    def apply_action(self, state, action):
-        """Apply an action (place a queen in a given row)."""
-        state = list(state)
-        for row in range(self.N):
-            if state[row] == -1:
-                state[row] = action
-                break
-        return tuple(state)
-
-    def get_best_action(self, state):
-        """Get the best action based on the Q-table."""
-        return np.argmax(self.q_table[state])
+            "efficiency": self.solutions_found / exec_time if exec_time > 0 else 0,
+            "solutions_found": self.solutions_found,
+            "q_states": len(self.q_table),
+            "q_evictions": self.q_table.evictions,
+        }))
+
+    def generate_solutions(self):
+        """Run the episodes in batches and yield every distinct board an episode completes."""
+        found = set()
+        budget = self.budget
+        for start in range(0, self.episodes, self.batch_size):
+            transitions = []
+            for _ in range(min(self.batch_size, self.episodes - start)):
+                if budget is not None and budget.spend() and self.interrupted():
+                    return
+                solution = self.run_episode(transitions)
+                if solution is not None and solution not in found:
+                    found.add(solution)
+                    yield self.unpack_placement(solution)
+            self.update(transitions)
+
+    def run_episode(self, transitions):
+        """Play one epsilon-greedy episode, appending (key, action, reward, next key) transitions.
+
+        Rows of the Q-table are only resolved in update(): a row looked up now could be
+        recycled for another state before the batch is learned from. Returns the packed
+        placement of the board if the episode completed it.
+        """
+        N = self.N
+        full = (1 << N) - 1
+        node = self.root_node()
+        key = self.state_key(node)
+        allowed = self.row_masks or [full] * N
+        free = allowed[0]
+        if self.stats is not None:
+            children = free.bit_count()
+            self.stats.expand(0, children, N - children)
+        if not free:
+            return None  # The constraints leave no square in the first row
+        while True:
+            action = self.get_best_action(key, free)
+            node = self.place_node(node, action)
+            if node[3] == N:
+                transitions.append((key, action, 1.0, None))
+                return node[4]
+            cols, diag, anti_diag, depth, _ = node
+            free = allowed[depth] & ~(cols | diag | anti_diag)
+            if self.stats is not None:
+                children = free.bit_count()
+                self.stats.expand(depth, children, N - children)
+            if not free:
+                transitions.append((key, action, -1.0, None))  # Dead end: no square left in the next row
+                return None
+            next_key = self.state_key(node)
+            transitions.append((key, action, 0.0, next_key))
+            key = next_key
+
+    def update(self, transitions):
+        """Vectorized Q-learning update of a batch of transitions.
+
+        Next-state values are read first (0 for states without a row), then the rows
+        of the updated states are resolved; those are the most recently used, so none
+        is recycled unless the batch has more states than the table.
+        """
+        if not transitions:
+            return
+        keys, actions, rewards, next_keys = zip(*transitions)
+        q_table = self.q_table
+        next_values = np.zeros(len(keys), dtype=np.float32)
+        for i, next_key in enumerate(next_keys):
+            row = None if next_key is None else q_table.row(next_key)
+            if row is not None:
+                next_values[i] = row.max()
+        slots = np.array([q_table.slot(key) for key in keys])
+        actions = np.array(actions)
+        values = q_table.values
+        targets = np.array(rewards, dtype=np.float32) + self.gamma * next_values
+        np.add.at(values, (slots, actions), self.alpha * (targets - values[slots, actions]))
+
+    def state_key(self, node):
+        """Compact int key of a partial board: its packed placement and depth."""
+        # The depth runs from 0 to N, so N.bit_length() low bits hold it without collisions
+        return node[4] << self.N.bit_length() | node[3]
+
+    def get_best_action(self, key, free):
+        """Epsilon-greedy choice among the free columns (bitmask) of the next row.
+
+        Ties and unvisited states are broken at random.
+        """
+        actions = [col for col in range(self.N) if free >> col & 1]
+        row = self.q_table.row(key)
+        if row is None or random.random() < self.epsilon:
+            return random.choice(actions)  # Explore
+        values = row[actions]
+        best = np.flatnonzero(values == values.max())  # Exploit
+        return actions[best[random.randrange(len(best))]]
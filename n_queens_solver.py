@@ -1,14 +1,593 @@
+import os
+import time
+from itertools import islice
+from constraints import CompletionMemo, constraint_masks
+from parallel_search import parallel_search
+from render_queue import RenderQueue
+from search_budget import SearchBudget, SearchCheckpoint
+from search_stats import SearchStats
+from solution_store import SolutionWriter
+from symmetry import DedupIndex, canonical_form, orbit_size, transforms
+
+
+class BoardState:
+    """Queens of a board, at most one per row, with column and diagonal occupancy counts.
+
+    place/remove/swap/is_safe/attacks are O(1) and `conflicts` (attacking pairs of
+    queens) is kept up to date by all three moves, so the solvers share one
+    kernel instead of rescanning the rows above a square or every pair of queens.
+    """
+    __slots__ = ("N", "queens", "cols", "diag", "anti_diag", "conflicts")
+
+    def __init__(self, N, state=()):
+        self.N = N
+        self.queens = [-1] * N  # Column of the queen of each row, -1 for an empty row
+        self.cols = cols = [0] * N
+        self.diag = diag = [0] * (2 * N - 1)  # Indexed by row - col + N - 1
+        self.anti_diag = anti_diag = [0] * (2 * N - 1)  # Indexed by row + col
+        conflicts = 0
+        for row, col in enumerate(state):  # place() inlined: loading a board is the common case
+            if col < 0:
+                continue
+            self.queens[row] = col
+            d = row - col + N - 1
+            a = row + col
+            conflicts += cols[col] + diag[d] + anti_diag[a]
+            cols[col] += 1
+            diag[d] += 1
+            anti_diag[a] += 1
+        self.conflicts = conflicts
+
+    def attacks(self, row, col):
+        """Number of queens (of other rows) attacking the square (row, col)."""
+        return self.cols[col] + self.diag[row - col + self.N - 1] + self.anti_diag[row + col]
+
+    def is_safe(self, row, col):
+        return not (self.cols[col] or self.diag[row - col + self.N - 1] or self.anti_diag[row + col])
+
+    def place(self, row, col):
+        """Put the queen of `row` on `col`, moving it if the row already has one."""
+        if self.queens[row] >= 0:
+            self.remove(row)
+        self.conflicts += self.attacks(row, col)
+        self.queens[row] = col
+        self.cols[col] += 1
+        self.diag[row - col + self.N - 1] += 1
+        self.anti_diag[row + col] += 1
+
+    def remove(self, row):
+        col = self.queens[row]
+        self.queens[row] = -1
+        self.cols[col] -= 1
+        self.diag[row - col + self.N - 1] -= 1
+        self.anti_diag[row + col] -= 1
+        self.conflicts -= self.attacks(row, col)
+
+    def swap(self, i, j):
+        """Swap the queens of rows i and j and return the change in conflicts, in O(1).
+
+        Both columns stay occupied, so only the diagonal counters move.
+        """
+        N = self.N
+        queens, diag, anti_diag = self.queens, self.diag, self.anti_diag
+        a, b = queens[i], queens[j]
+        delta = 0
+        for row, old_col, new_col in ((i, a, b), (j, b, a)):
+            # Leaving a diagonal with c queens removes c - 1 pairs, joining one with c queens adds c
+            diag[row - old_col + N - 1] -= 1
+            delta -= diag[row - old_col + N - 1]
+            anti_diag[row + old_col] -= 1
+            delta -= anti_diag[row + old_col]
+            delta += diag[row - new_col + N - 1]
+            diag[row - new_col + N - 1] += 1
+            delta += anti_diag[row + new_col]
+            anti_diag[row + new_col] += 1
+        queens[i], queens[j] = b, a
+        self.conflicts += delta
+        return delta
+
+    def count_conflicts(self):
+        """Attacking pairs recounted from the occupancy counters, in O(N)."""
+        return sum(c * (c - 1) // 2 for lines in (self.cols, self.diag, self.anti_diag) for c in lines if c > 1)
+
+    def copy(self):
+        board = BoardState.__new__(BoardState)
+        board.N = self.N
+        board.queens = self.queens[:]
+        board.cols = self.cols[:]
+        board.diag = self.diag[:]
+        board.anti_diag = self.anti_diag[:]
+        board.conflicts = self.conflicts
+        return board
+
+    def is_complete(self):
+        return -1 not in self.queens
+
+
 class NQueensSolver:
-    def __init__(self, N):
+    EXHAUSTIVE = True  # Whether generate_solutions() enumerates every solution
+    RESUMABLE = False  # Whether generate_solutions() can continue from a SearchCheckpoint
+    CONSTRAINABLE = True  # Whether generate_solutions() honors fixed queens and blocked squares
+
+    def __init__(self, N, render="all", render_limit=10, render_workers=None, render_backend="raster",
+                 symmetry=False, keep_solutions=True, cache=None, stats=None, time_limit=None, node_limit=None,
+                 cancel=None, checkpoint=None, fixed=None, blocked=None, memo=None):
         self.N = N
         self.solutions = []
         self.metrics = []
+        self.symmetry = symmetry
+        self.orbit_sizes = []
+        self.keep_solutions = keep_solutions
+        self.count_only = False  # Set by count_solutions() while only the count of a run is needed
+        self.solutions_found = 0
+        self.column_bits = max(1, (N - 1).bit_length())
+        self.cache = cache
+        self.from_cache = False
+        # Search counters (a SearchStats, or True for a fresh one); None keeps them off
+        self.stats = SearchStats() if stats is True else stats or None
+        # Budget checks stay off (None) unless a limit, a token or a checkpoint asks for them
+        self.checkpoint = SearchCheckpoint(checkpoint) if isinstance(checkpoint, (str, os.PathLike)) else checkpoint
+        if self.checkpoint is not None and not self.RESUMABLE:
+            raise ValueError(f"{type(self).__name__} cannot resume from a checkpoint")
+        limited = (time_limit, node_limit, cancel, self.checkpoint) != (None, None, None, None)
+        self.budget = SearchBudget(time_limit, node_limit, cancel) if limited else None
+        self.resume_position = None
+        self.render = render
+        self.render_limit = render_limit
+        self.render_workers = render_workers
+        self.render_backend = render_backend  # "raster", "svg" or "matplotlib"
+        self.render_queue = None
+        self.workers = None  # Process pool size of solvers that split their search (see use_workers)
+        self.split_depth = 2
+        self.worker_metrics = None
+        # Completion counts shared between queries (a CompletionMemo, or one of our own on first use)
+        self.memo = memo
+        self.constrain(fixed, blocked)
+
+    # Board checks, all on the BoardState kernel
+
+    def board_state(self, state=()):
+        """BoardState of a (partial) board given as one column per row, -1 for empty rows.
+
+        A BoardState is returned as is, so the checks below take either.
+        """
+        return state if isinstance(state, BoardState) else BoardState(self.N, state)
 
     def is_safe(self, board, row, col):
         """Έλεγχος αν μια βασίλισσα μπορεί να τοποθετηθεί με ασφάλεια."""
-        for i in range(row):
-            if board[i] == col or \
-               board[i] - i == col - row or \
-               board[i] + i == col + row:
-                return False
-        return True
+        if not isinstance(board, BoardState):
+            board = BoardState(self.N, board[:row])
+        return board.is_safe(row, col)
+
+    def is_valid_move(self, state, row, col):
+        """Check if placing a queen at (row, col) is valid."""
+        return self.is_safe(state, row, col)
+
+    def is_valid_board(self, state):
+        """Check if the entire board configuration is valid (no conflicts)."""
+        return self.board_state(state).conflicts == 0
+
+    def compute_reward(self, state):
+        """Compute the reward for a given state (lower is better): the attacking pairs of queens."""
+        return self.board_state(state).conflicts
+
+    def is_goal_state(self, state):
+        """Check if the state is a valid solution (every row placed, no attacking queens)."""
+        board = self.board_state(state)
+        return board.conflicts == 0 and board.is_complete()
+
+    def get_possible_next_states(self, state, board=None):
+        """Generate all valid next states by placing a queen in the next row."""
+        next_row = state.index(-1)
+        board = self.board_state(state if board is None else board)
+        next_states = []
+
+        for col in self.candidate_columns(state, next_row):
+            if board.is_safe(next_row, col):
+                new_state = state.copy()
+                new_state[next_row] = col
+                next_states.append(new_state)
+
+        return next_states
+
+    def generate_solutions(self):
+        """Raw search of the solver; subclasses override it with their own algorithm."""
+        stats = self.stats
+        budget = self.budget
+        allowed = self.row_masks
+        board = BoardState(self.N)
+        is_safe = board.is_safe
+        state = []
+        col = 0
+        while True:
+            if len(state) == self.N:
+                yield list(state)
+                col = self.N  # Force a backtrack
+            if budget is not None and budget.spend() and self.interrupted():
+                return
+            row = len(state)
+            tried = col
+            while col < self.N and ((allowed is not None and not allowed[row] >> col & 1)
+                                    or not is_safe(row, col)):
+                col += 1
+            if stats is not None:
+                stats.visit(1, col - tried)
+            if col < self.N:
+                state.append(col)
+                board.place(row, col)
+                col = 0
+            elif state:
+                board.remove(row - 1)
+                col = state.pop() + 1
+            else:
+                return
+
+    # Compact search nodes: (columns, diagonals, anti-diagonals, depth, placement), where the
+    # masks are the squares attacked in the next row and the placement packs one column per
+    # row into an int.
+
+    def root_node(self, prefix=()):
+        """Packed node of an empty board, or of a board with the given (valid) prefix placed."""
+        node = (0, 0, 0, 0, 0)
+        for col in prefix:
+            node = self.place_node(node, col)
+        return node
+
+    def place_node(self, node, col):
+        """Packed node after placing a queen at `col` in the next row (not checked)."""
+        cols, diag, anti_diag, depth, placement = node
+        full = (1 << self.N) - 1
+        bit = 1 << col
+        return (cols | bit, ((diag | bit) << 1) & full, (anti_diag | bit) >> 1, depth + 1,
+                placement | col << (self.column_bits * depth))
+
+    def child_nodes(self, node):
+        """Every valid placement in the next row, lowest column first."""
+        cols, diag, anti_diag, depth, placement = node
+        full = (1 << self.N) - 1
+        free = full & ~(cols | diag | anti_diag)
+        if self.symmetry and depth <= 1:
+            free &= self.symmetry_mask(self.unpack_placement(placement, depth), depth)
+        if self.row_masks is not None:
+            free &= self.row_masks[depth]
+        if self.stats is not None:
+            children = free.bit_count()
+            self.stats.expand(depth, children, self.N - children)
+        while free:
+            bit = free & -free
+            free ^= bit
+            col = bit.bit_length() - 1
+            yield (cols | bit, ((diag | bit) << 1) & full, (anti_diag | bit) >> 1, depth + 1,
+                   placement | col << (self.column_bits * depth))
+
+    def unpack_placement(self, placement, rows=None):
+        """Columns of the first `rows` rows (all N by default) of a packed placement."""
+        mask = (1 << self.column_bits) - 1
+        return [(placement >> (self.column_bits * row)) & mask for row in range(self.N if rows is None else rows)]
+
+    def iter_solutions(self, limit=None):
+        """Yield solutions lazily, at most `limit` of them when given.
+
+        In symmetry mode only fundamental solutions are yielded; solutions_found
+        keeps the orbit-weighted total of what has been yielded so far. With a
+        cache, an already enumerated N is served from disk, and a complete
+        enumeration is written back to it.
+
+        With a budget the stream simply ends early and `status` tells why. With a
+        checkpoint, a search interrupted earlier continues where it stopped: only
+        the remaining solutions are yielded, on top of the restored counts.
+        """
+        self.solutions_found = 0
+        self.orbit_sizes = []
+        self.resume_position = None
+        if self.stats is not None:
+            self.stats.reset()
+        if self.budget is not None:
+            self.budget.start()
+        cached = self.cached_solutions()
+        self.from_cache = cached is not None
+        if self.from_cache:
+            solutions = self.counted_solutions(cached)
+        else:
+            saved = self.checkpoint.load(self.checkpoint_key()) if self.checkpoint is not None else None
+            if saved is not None:
+                self.resume_position = saved["position"]
+                self.solutions_found = saved["solutions_found"]
+                self.orbit_sizes = saved["orbit_sizes"]
+            record = self.cache is not None and self.EXHAUSTIVE and saved is None and self.row_masks is None
+            keep = record and not self.counts_in_workers()  # Boards counted in workers never reach this process
+            solutions = self.counted_solutions(self.generate_solutions(), DedupIndex(self.N) if keep else None, record)
+        return islice(solutions, limit)
+
+    def counts_in_workers(self):
+        """Whether generate_solutions() only adds worker counts to this run and yields no boards."""
+        return self.count_only and bool(self.workers and self.workers > 1)
+
+    def counted_solutions(self, solutions, fundamentals=None, record=False):
+        """Apply count_solution to a raw stream; with `record`, cache the results once it is exhausted."""
+        for state in solutions:
+            if self.count_solution(state):
+                if fundamentals is not None:
+                    fundamentals.add(state)
+                yield state
+        if self.status != "complete":
+            return  # Stopped by the budget: partial results are neither cached nor final
+        if self.checkpoint is not None:
+            self.checkpoint.clear()
+        if record:
+            boards = fundamentals.boards() if fundamentals is not None else None
+            self.cache.put(self.N, type(self).__name__, self.solutions_found, boards)
+
+    @property
+    def status(self):
+        """'complete', or why the budget stopped the last run ('timeout', 'node_limit', 'cancelled')."""
+        return self.budget.status if self.budget is not None else "complete"
+
+    def interrupted(self, position=None):
+        """Slow path of a budget check: True once the search has to stop.
+
+        Resumable searches pass their current position, which is written to the
+        checkpoint when one is due and when the search stops.
+        """
+        stop = self.budget.exhausted()
+        if self.checkpoint is not None and position is not None and (stop or self.checkpoint.due()):
+            self.checkpoint.save(self.checkpoint_key(), position, self.solutions_found, self.orbit_sizes)
+        return stop
+
+    def checkpoint_key(self):
+        """What a checkpoint has to match to be resumed by this solver."""
+        key = {"N": self.N, "solver": type(self).__name__, "symmetry": bool(self.symmetry)}
+        if self.row_masks is not None:
+            # Lists, not tuples, so the key compares equal to its JSON copy in the checkpoint file
+            key.update(fixed=[[row, col] for row, col in sorted(self.fixed.items())],
+                       blocked=[[row, col] for row, col in sorted(self.blocked)])
+        return key
+
+    # Completion queries: fixed queens and blocked squares become one mask of allowed columns
+    # per row (row_masks), which every search applies next to its column and diagonal masks.
+
+    def constrain(self, fixed=None, blocked=None):
+        """Only look for boards with the `fixed` queens ({row: col} or (row, col) pairs) and
+        no queen on the `blocked` (row, col) squares; no arguments lifts the constraints.
+        """
+        self.fixed = dict(fixed.items() if isinstance(fixed, dict) else fixed or ())
+        self.blocked = {tuple(square) for square in blocked or ()}
+        if not self.fixed and not self.blocked:
+            self.row_masks = self.query_masks = None
+            return
+        if not self.CONSTRAINABLE:
+            raise ValueError(f"{type(self).__name__} does not support fixed queens or blocked squares")
+        if self.symmetry:
+            raise ValueError("Fixed queens and blocked squares break the board symmetry; use symmetry=False")
+        self.row_masks = constraint_masks(self.N, self.fixed, self.blocked)
+        self.query_masks = constraint_masks(self.N, self.fixed, self.blocked, attacks=False)
+
+    def count_completions(self):
+        """Number of boards that satisfy the constraints, with subtree counts kept in the memo.
+
+        Any query reaching a subproblem (row, occupied columns and diagonals,
+        constraints of the remaining rows) that an earlier query of the same memo
+        solved reuses its count instead of searching that subtree again. The search
+        prunes with row_masks, but subproblems are keyed by query_masks: squares
+        attacked by a fixed queen yield no completion either way, so the counts
+        agree, and queries that differ in earlier rows still share their keys.
+        """
+        if self.memo is None:
+            self.memo = CompletionMemo()
+        memo = self.memo
+        N = self.N
+        full = (1 << N) - 1
+        masks = self.row_masks or [full] * N
+        query_masks = self.query_masks or masks
+        suffix_ids = [memo.suffix_id(N, query_masks[row:]) for row in range(N)]
+        min_rows = memo.min_rows
+
+        def count(row, cols, diag, anti_diag):
+            if row == N:
+                return 1
+            key = None
+            if N - row >= min_rows:
+                key = (row, cols, diag, anti_diag, suffix_ids[row])
+                total = memo.get(key)
+                if total is not None:
+                    return total
+            total = 0
+            free = masks[row] & ~(cols | diag | anti_diag)
+            while free:
+                bit = free & -free
+                free ^= bit
+                total += count(row + 1, cols | bit, ((diag | bit) << 1) & full, (anti_diag | bit) >> 1)
+            if key is not None:
+                memo.put(key, total)
+            return total
+
+        return count(0, 0, 0, 0)
+
+    def cached_solutions(self):
+        """Solutions rebuilt from the cached fundamental solutions of N, or None on a miss.
+
+        Without symmetry mode the orbits are expanded one fundamental solution at
+        a time, so boards stream out grouped by orbit rather than in search order.
+        """
+        if self.cache is None or not self.EXHAUSTIVE or self.row_masks is not None:
+            return None
+        store = self.cache.fundamental_solutions(self.N, type(self).__name__)
+        if store is None:
+            return None
+        fundamentals = ([int(col) for col in row] for row in store)
+        if self.symmetry:
+            return fundamentals
+        return (list(state) for f in fundamentals for state in sorted(set(transforms(f))))
+
+    def count_solutions(self, sink=None, limit=None):
+        """Count-only consumer of iter_solutions; each solution is passed to `sink` and dropped.
+
+        Plain counts of completion queries (or of any solver given a memo) come from
+        count_completions() instead.
+        """
+        counting = sink is None and limit is None and self.EXHAUSTIVE
+        if counting and (self.row_masks is not None or self.memo is not None) and not self.symmetry:
+            self.solutions_found = self.count_completions()
+            self.from_cache = False
+            return self.solutions_found
+        if counting and self.cache is not None:
+            count = self.cache.count(self.N, type(self).__name__)
+            if count is not None:
+                self.solutions_found = count
+                self.from_cache = True
+                return count
+        self.count_only = counting
+        try:
+            for state in self.iter_solutions(limit):
+                if sink is not None:
+                    sink(state)
+        finally:
+            self.count_only = False
+        return self.solutions_found
+
+    def save_solutions(self, path, limit=None, packed=None):
+        """Stream solutions into a packed SolutionWriter file and return how many were written."""
+        with SolutionWriter(path, self.N, packed) as writer:
+            self.count_solutions(writer, limit)
+        return writer.count
+
+    def collect_solution(self, state):
+        """Sink used by solve(): queue the board image and keep it unless keep_solutions is off."""
+        self.render_queue.submit(state)
+        if self.keep_solutions:
+            self.all_solutions.append(state)
+
+    def count_solution(self, state):
+        """Add a found board to solutions_found; returns False for skipped symmetric copies."""
+        weight = self.solution_weight(state)
+        self.solutions_found += weight
+        return weight > 0
+
+    def open_render_queue(self, method_folder):
+        """Start the background render queue for one solve() run."""
+        self.render_queue = RenderQueue(self.N, method_folder, self.render, self.render_limit,
+                                        self.render_workers, backend=self.render_backend)
+        return self.render_queue
+
+    def close_render_queue(self, metrics):
+        """Drain the render queue and add its timings to the metrics of the run."""
+        render_time, render_wait = self.render_queue.close() if self.render_queue else (0.0, 0.0)
+        if self.render_queue is not None and self.render_queue.errors:
+            metrics["render_errors"] = self.render_queue.errors
+        self.render_queue = None
+        metrics["render_time"] = render_time
+        metrics["render_wait"] = render_wait
+        return metrics
+
+    def finish_run(self, metrics):
+        """Close the render queue and keep the metrics of a solve() run in the cache."""
+        self.close_render_queue(metrics)
+        metrics["status"] = self.status
+        if self.stats is not None:
+            metrics["search_stats"] = self.stats.as_dict()
+        if self.row_masks is not None:
+            metrics["constraints"] = {"fixed": len(self.fixed), "blocked": len(self.blocked)}
+        # Only complete, unconstrained runs from scratch describe the enumeration the cache keeps for N
+        full_run = self.status == "complete" and not self.resume_position and self.row_masks is None
+        if self.from_cache:
+            metrics["cached"] = True
+        elif self.cache is not None and self.EXHAUSTIVE and full_run:
+            self.cache.put_metrics(self.N, type(self).__name__, metrics)
+        return metrics
+
+    # Parallel search: solvers whose search can start from a prefix call use_workers() and
+    # hand generate_solutions() to parallel_solutions() when workers > 1.
+
+    def use_workers(self, workers, split_depth):
+        """Split the search over a process pool of `workers`, by prefixes of `split_depth` rows."""
+        if self.checkpoint is not None and workers and workers > 1:
+            raise ValueError("Checkpoints are only supported by the serial search")
+        self.workers = workers
+        self.split_depth = split_depth
+
+    def parallel_solutions(self, search_method, reverse=False):
+        """Complete every prefix subproblem with `search_method` in a process pool.
+
+        Each prefix's results are yielded once it is done, in prefix order (descending
+        with `reverse`). When only the count is needed, the workers report counts
+        instead of boards.
+        """
+        count_only = self.counts_in_workers()
+        self.worker_metrics = []
+        results = parallel_search(type(self), search_method, self.N,
+                                  self.workers, self.split_depth, self.prefix_allowed,
+                                  stats=self.stats is not None,
+                                  deadline=self.worker_deadline(),
+                                  solver_kwargs={"fixed": self.fixed, "blocked": self.blocked,
+                                                 "symmetry": self.symmetry},
+                                  count_only=count_only, reverse=reverse, worker_metrics=self.worker_metrics)
+        for _, result in results:
+            if count_only:
+                self.add_worker_counts(result)
+            else:
+                yield from result.tolist()
+        self.merge_workers(self.worker_metrics)
+
+    def worker_deadline(self):
+        """Wall-clock deadline for parallel workers, from the time limit of this run."""
+        if self.budget is None or self.budget.deadline is None:
+            return None
+        return time.time() + self.budget.deadline - time.perf_counter()
+
+    def merge_workers(self, worker_metrics):
+        """Fold the SearchStats and budget status of parallel workers into this solver."""
+        for worker in worker_metrics:
+            if self.stats is not None:
+                self.stats.merge(worker["search_stats"])
+            if self.budget is not None and worker["status"] != "complete":
+                self.budget.status = worker["status"]
+
+    def add_worker_counts(self, counts):
+        """Fold the (boards, count, orbit sizes) a parallel worker reports for one prefix into this run."""
+        _, count, orbit_sizes = counts
+        self.solutions_found += count
+        self.orbit_sizes.extend(orbit_sizes.elements())
+
+    def candidate_columns(self, state, row):
+        """Columns to try in a row; symmetry mode keeps the first two rows in the left half."""
+        if self.row_masks is not None:
+            return [col for col in range(self.N) if self.row_masks[row] >> col & 1]
+        if not self.symmetry or row > 1:
+            return range(self.N)
+        half = self.N // 2
+        if row == 0:
+            return range(half + self.N % 2)  # Left half plus the middle column for odd N
+        if self.N % 2 and state[0] == half:
+            return range(half)  # Mirror images of a middle first queen differ from row 1 on
+        return range(self.N)
+
+    def symmetry_mask(self, state, row):
+        """Bitmask version of candidate_columns for the bitmask engines."""
+        columns = self.candidate_columns(state, row)
+        return (1 << len(columns)) - 1
+
+    def prefix_allowed(self, prefix):
+        """Check a partial placement against the restrictions of candidate_columns."""
+        rows = prefix if self.row_masks is not None else prefix[:2]
+        return all(col in self.candidate_columns(prefix, row) for row, col in enumerate(rows))
+
+    def solution_weight(self, state):
+        """How many solutions a found board stands for.
+
+        Without symmetry mode every board counts once. In symmetry mode only the
+        canonical board of each orbit is kept and counts for its orbit size; the
+        other symmetric copies weigh 0 and should be skipped.
+        """
+        if not self.symmetry:
+            return 1
+        if tuple(state) != canonical_form(state):
+            return 0
+        size = orbit_size(state)
+        self.orbit_sizes.append(size)
+        return size
+
+    def add_symmetry_metrics(self, metrics):
+        """Report the fundamental solutions next to the orbit-weighted total."""
+        if self.symmetry:
+            metrics["fundamental_solutions"] = len(self.orbit_sizes)
+        return metrics
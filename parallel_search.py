@@ -0,0 +1,138 @@
+import multiprocessing
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import chain
+
+import numpy as np
+
+from search_stats import SearchStats
+
+
+def prefix_subproblems(N, depth):
+    """List every valid placement of the first `depth` rows in lexicographic order."""
+    prefixes = [[]]
+    for row in range(min(depth, N)):
+        prefixes = [
+            prefix + [col]
+            for prefix in prefixes
+            for col in range(N)
+            if all(prefix[r] != col and abs(prefix[r] - col) != row - r for r in range(row))
+        ]
+    return prefixes
+
+
+CANCEL = None  # Stop flag of the pool this worker process belongs to, set by init_worker
+
+
+def init_worker(cancel):
+    """Pool initializer: the Event is handed over at process start, as Events cannot be pickled per task."""
+    global CANCEL
+    CANCEL = cancel
+
+
+def solve_chunk(solver_class, search_method, N, chunk, stats=False, deadline=None, solver_kwargs=None,
+                count_only=False):
+    """Worker entry point: complete each (index, prefix) of the chunk with the solver's search.
+
+    The boards of a prefix come back as one packed (count, N) array, or, with
+    `count_only`, as (boards, orbit-weighted count, {orbit size: fundamentals})
+    from the worker solver's count_solution, so no board leaves the worker.
+    `deadline` (wall-clock time), or the pool's cancel flag, stops the chunk
+    early; its status then says so.
+    """
+    start_time = time.time()
+    time_limit = None if deadline is None else max(0.0, deadline - start_time)
+    solver = solver_class(N, render="off", stats=stats, time_limit=time_limit, cancel=CANCEL,
+                          **(solver_kwargs or {}))
+    search = getattr(solver, search_method)
+    dtype = np.uint8 if N <= 256 else np.uint16 if N <= 1 << 16 else np.uint32
+    results = []
+    for index, prefix in chunk:
+        if solver.status != "complete":
+            break
+        if count_only:
+            boards = 0
+            found_before = solver.solutions_found
+            solver.orbit_sizes = []
+            for state in search(prefix):
+                boards += 1
+                solver.count_solution(state)
+            results.append((index, (boards, solver.solutions_found - found_before, Counter(solver.orbit_sizes))))
+        else:
+            packed = np.fromiter(chain.from_iterable(search(prefix)), dtype=dtype)
+            results.append((index, packed.reshape(-1, N)))
+    search_stats = solver.stats.as_dict() if stats else None
+    return os.getpid(), time.time() - start_time, results, search_stats, solver.status
+
+
+def parallel_search(solver_class, search_method, N, workers=None, depth=2, prefix_filter=None,
+                    chunks_per_worker=8, stats=False, deadline=None, solver_kwargs=None,
+                    count_only=False, reverse=False, worker_metrics=None):
+    """Split the search tree by board prefixes and complete them in a process pool.
+
+    Chunks are kept small so idle workers keep pulling new prefixes from the pool's
+    queue while slower subtrees are still running. Yields (index, result) for every
+    prefix in prefix order (descending with `reverse`) as soon as the prefix and
+    all before it are done; a result is the packed array or count tuple of
+    solve_chunk. `prefix_filter` can drop prefixes before they are handed out.
+    With `stats`, every worker also reports the SearchStats counters of its
+    subtrees. With a `deadline` (time.time()), workers stop at it and report a
+    "timeout" status; the prefixes they did not finish are left partial or
+    empty. `solver_kwargs` go to the workers' solvers (e.g. the constraints of a
+    completion query). Per-worker metrics are appended to `worker_metrics` once
+    every chunk is done.
+    """
+    workers = workers or os.cpu_count() or 1
+    prefixes = prefix_subproblems(N, depth)
+    if prefix_filter is not None:
+        prefixes = [prefix for prefix in prefixes if prefix_filter(prefix)]
+    prefixes = list(enumerate(prefixes))
+    if reverse:
+        prefixes.reverse()  # Hand out the prefixes in the order they are consumed
+    chunk_size = max(1, len(prefixes) // (workers * chunks_per_worker))
+    chunks = [prefixes[i:i + chunk_size] for i in range(0, len(prefixes), chunk_size)]
+    order = [index for index, _ in prefixes]
+
+    done = {}  # index -> result of finished prefixes not yielded yet
+    position = 0
+    per_worker = {}
+    cancel = multiprocessing.Event()
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(cancel,))
+    try:
+        futures = {executor.submit(solve_chunk, solver_class, search_method, N, chunk, stats, deadline,
+                                   solver_kwargs, count_only): chunk
+                   for chunk in chunks}
+        for future in as_completed(futures):
+            pid, elapsed, chunk_results, chunk_stats, status = future.result()
+            worker = per_worker.setdefault(pid, {"worker": pid, "subproblems": 0, "time": 0.0, "solutions_found": 0,
+                                                 "status": "complete"})
+            worker["subproblems"] += len(chunk_results)
+            worker["time"] += elapsed
+            if status != "complete":
+                worker["status"] = status
+            if chunk_stats is not None:
+                worker_stats = worker.setdefault("search_stats", SearchStats())
+                worker_stats.merge(chunk_stats)
+            for index, result in chunk_results:
+                done[index] = result
+                worker["solutions_found"] += result[0] if count_only else len(result)
+            # Chunks of a stopped worker may be short: their missing prefixes count as empty
+            for index, _ in futures[future]:
+                done.setdefault(index, None)
+            while position < len(order) and order[position] in done:
+                result = done.pop(order[position])
+                if result is not None:
+                    yield order[position], result
+                position += 1
+    finally:
+        # A consumer that stops early drops the rest: running chunks stop at their next budget check
+        cancel.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    for worker in per_worker.values():
+        if "search_stats" in worker:
+            worker["search_stats"] = worker["search_stats"].as_dict()
+    if worker_metrics is not None:
+        worker_metrics.extend(per_worker.values())
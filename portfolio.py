@@ -0,0 +1,210 @@
+"""Portfolio racing: run several solvers at once and keep the first valid answer.
+
+Usage:
+    python -m portfolio --n 200 --strategies min-conflicts:1,min-conflicts:2,backtracking-bitmask
+    python -m portfolio --n 200 --adaptive 2        # the 2 strategies that won most often for N
+    python -m portfolio --history                   # wins per N so far
+
+A strategy is a method name of `python -m bench` plus an optional random seed
+("method:seed"). Each one runs in its own process; the first solution that
+passes validate_board wins and the others are cancelled through their budget's
+cancellation token. Every race is recorded in a small JSON history (wins, races
+and winning times per N and strategy), which choose() uses to race only the
+strategies that tend to win for N, or for the nearest N raced so far.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import random
+import sys
+import time
+
+import numpy as np
+
+from bench import METHODS, make_solver
+from methods.constructive import validate_board
+from solution_cache import DEFAULT_CACHE_DIR
+
+DEFAULT_STRATEGIES = ["constructive", "backtracking-bitmask", "min-conflicts:1", "min-conflicts:2",
+                      "genetic-numpy:1"]
+DEFAULT_HISTORY = os.path.join(DEFAULT_CACHE_DIR, "portfolio.json")
+
+
+def parse_strategy(strategy):
+    """'method' or 'method:seed' -> (method, seed or None)."""
+    method, _, seed = strategy.partition(":")
+    if method not in METHODS:
+        raise ValueError(f"Unknown method in strategy {strategy!r}")
+    return method, int(seed) if seed else None
+
+
+def race_strategy(strategy, N, cancel, time_limit, results):
+    """Process entry point: look for one solution with `strategy` and report (strategy, board, elapsed, status)."""
+    method, seed = parse_strategy(strategy)
+    if seed is not None:
+        random.seed(seed)
+    start_time = time.perf_counter()
+    solver = make_solver(method, N, cancel=cancel, time_limit=time_limit)
+    state = next(solver.iter_solutions(limit=1), None)
+    board = None if state is None else np.asarray(state, dtype=np.int64)
+    results.put((strategy, board, time.perf_counter() - start_time, solver.status))
+
+
+class RaceHistory:
+    """Wins, races and winning times per N and strategy, kept in a JSON file."""
+
+    def __init__(self, path=DEFAULT_HISTORY):
+        self.path = path
+        try:
+            with open(path) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}  # N -> strategy -> {"races", "wins", "win_time"}
+
+    def record(self, N, strategies, winner, elapsed):
+        by_strategy = self.entries.setdefault(str(N), {})
+        for strategy in strategies:
+            entry = by_strategy.setdefault(strategy, {"races": 0, "wins": 0, "win_time": 0.0})
+            entry["races"] += 1
+            if strategy == winner:
+                entry["wins"] += 1
+                entry["win_time"] += elapsed
+        self.save()
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.entries, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def ranking(self, N):
+        """Strategies raced for N (or the nearest N with a history), best first: win rate, then mean winning time."""
+        if not self.entries:
+            return []
+        nearest = min(self.entries, key=lambda n: abs(int(n) - N))
+        by_strategy = self.entries[nearest]
+
+        def score(strategy):
+            entry = by_strategy[strategy]
+            mean_time = entry["win_time"] / entry["wins"] if entry["wins"] else float("inf")
+            return -entry["wins"] / entry["races"], mean_time
+
+        return sorted(by_strategy, key=score)
+
+
+def choose(N, history, strategies=DEFAULT_STRATEGIES, size=2, explore=0.1):
+    """Adaptive policy: the `size` best strategies for N from the history.
+
+    With probability `explore` one of them is swapped for a random other
+    strategy, so a strategy that started badly still gets raced now and then.
+    Strategies never raced near N come first, until each has a record.
+    """
+    ranked = [strategy for strategy in history.ranking(N) if strategy in strategies]
+    untried = [strategy for strategy in strategies if strategy not in ranked]
+    chosen = (untried + ranked)[:size]
+    others = [strategy for strategy in strategies if strategy not in chosen]
+    if others and chosen and random.random() < explore:
+        chosen[-1] = random.choice(others)
+    return chosen
+
+
+def race(N, strategies=DEFAULT_STRATEGIES, time_limit=60.0, history=None, grace=5.0):
+    """Race `strategies` on N; returns the winner, its board and time, and how every strategy ended.
+
+    The winner is None when no strategy found a valid board within time_limit.
+    """
+    for strategy in strategies:
+        parse_strategy(strategy)
+    results = multiprocessing.Queue()
+    cancel = multiprocessing.Event()
+    processes = [multiprocessing.Process(target=race_strategy, daemon=True,
+                                         args=(strategy, N, cancel, time_limit, results))
+                 for strategy in strategies]
+    start_time = time.perf_counter()
+    for process in processes:
+        process.start()
+
+    outcome = {"N": N, "winner": None, "solution": None, "time": None, "strategies": {}}
+    deadline = start_time + time_limit
+    try:
+        while len(outcome["strategies"]) < len(strategies) and time.perf_counter() < deadline:
+            try:
+                strategy, board, elapsed, status = results.get(timeout=0.05)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes) and results.empty():
+                    break  # Crashed without reporting
+                continue
+            valid = board is not None and validate_board(board)
+            outcome["strategies"][strategy] = {"status": status, "time": elapsed, "valid": valid}
+            if valid:
+                outcome.update(winner=strategy, solution=board.tolist(), time=time.perf_counter() - start_time)
+                break
+    finally:
+        cancel.set()
+        # Keep draining the results so no loser blocks on flushing its report
+        stop_by = time.perf_counter() + grace
+        while any(process.is_alive() for process in processes) and time.perf_counter() < stop_by:
+            try:
+                strategy, _, elapsed, status = results.get(timeout=0.05)
+                outcome["strategies"].setdefault(strategy, {"status": status, "time": elapsed, "valid": None})
+            except queue.Empty:
+                pass
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+    for strategy in strategies:
+        outcome["strategies"].setdefault(strategy, {"status": "terminated", "time": None, "valid": None})
+
+    if history is not None and outcome["winner"] is not None:
+        history.record(N, strategies, outcome["winner"], outcome["time"])
+    return outcome
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m portfolio", description=__doc__.splitlines()[0])
+    parser.add_argument("--n", type=int, help="board size")
+    parser.add_argument("--strategies", default=",".join(DEFAULT_STRATEGIES),
+                        help=f"comma-separated 'method[:seed]' list; methods: {', '.join(METHODS)}")
+    parser.add_argument("--adaptive", type=int, metavar="K", help="race the K best strategies for N instead")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds before the race is given up")
+    parser.add_argument("--history-file", default=DEFAULT_HISTORY)
+    parser.add_argument("--history", action="store_true", help="print the recorded wins and exit")
+    args = parser.parse_args(argv)
+
+    history = RaceHistory(args.history_file)
+    if args.history:
+        for N, by_strategy in sorted(history.entries.items(), key=lambda item: int(item[0])):
+            print(f"N={N}: " + ", ".join(f"{strategy} {entry['wins']}/{entry['races']}"
+                                         for strategy, entry in by_strategy.items()))
+        return 0
+    if args.n is None:
+        parser.error("--n is required")
+
+    strategies = [s.strip() for s in args.strategies.split(",") if s.strip()]
+    try:
+        for strategy in strategies:
+            parse_strategy(strategy)
+    except ValueError as error:
+        parser.error(str(error))
+    if args.adaptive:
+        strategies = choose(args.n, history, strategies, args.adaptive)
+
+    outcome = race(args.n, strategies, args.timeout, history)
+    for strategy, result in outcome["strategies"].items():
+        elapsed = f"{result['time'] * 1000:.1f} ms" if result["time"] is not None else "-"
+        print(f"{strategy:>28} {result['status']:>10} {elapsed}")
+    if outcome["winner"] is None:
+        print(f"N={args.n}: no strategy found a solution (time limit {args.timeout} s)")
+        return 1
+    print(f"N={args.n}: {outcome['winner']} won in {outcome['time'] * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
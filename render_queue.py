@@ -0,0 +1,112 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from visualizer import BACKENDS, save_contact_sheet, visualize_solution
+
+RENDER_MODES = ("off", "first-k", "all", "sheet")
+MAX_RENDER_N = 1024  # Larger boards are not rendered: a raster image is N x N pixels at the very least
+
+
+def render_batch(N, jobs, backend="raster"):
+    """Render a batch of (state, output_path) jobs and return the time spent."""
+    start_time = time.time()
+    for state, output_path in jobs:
+        visualize_solution(N, state, output_path, backend)
+    return time.time() - start_time
+
+
+def render_sheet(N, states, output_path):
+    """Tile all states into one contact sheet and return the time spent."""
+    start_time = time.time()
+    save_contact_sheet(N, states, output_path)
+    return time.time() - start_time
+
+
+class RenderQueue:
+    """Collects solutions found by a solver and renders them in a background process pool.
+
+    Mode "sheet" keeps every solution and tiles them into a single
+    contact_sheet.png when the queue is closed. Boards larger than MAX_RENDER_N
+    are never rendered, and a failed render is counted in `errors` instead of
+    failing the solver's run.
+    """
+
+    def __init__(self, N, folder, mode="all", limit=10, workers=None, batch_size=32, backend="raster"):
+        if mode not in RENDER_MODES:
+            raise ValueError(f"Unknown render mode: {mode!r}")
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown visualizer backend: {backend!r}")
+        self.N = N
+        self.folder = folder
+        self.mode = mode
+        self.limit = limit
+        self.workers = workers
+        self.batch_size = batch_size
+        self.backend = backend
+        self.submitted = 0
+        self.batch = []
+        self.pending = []
+        self.executor = None
+        self.errors = 0
+
+    def accepts(self):
+        """Check if the next solution would be rendered under the current mode."""
+        if self.mode == "off" or self.N > MAX_RENDER_N:
+            return False
+        return self.mode in ("all", "sheet") or self.submitted < self.limit
+
+    def submit(self, state):
+        """Queue a solution for rendering; the search never waits on the images."""
+        if not self.accepts():
+            return
+        if self.mode == "sheet":
+            self.batch.append(list(state))
+            self.submitted += 1
+            return
+        self.start()
+
+        extension = "svg" if self.backend == "svg" else "png"
+        output_path = f"{self.folder}/solution_{self.submitted}.{extension}"
+        self.batch.append((list(state), output_path))
+        self.submitted += 1
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def start(self):
+        """Create the output folder and the pool on the first image."""
+        if self.executor is None:
+            if not os.path.exists(self.folder):
+                os.makedirs(self.folder)
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def flush(self):
+        """Hand the current batch over to the pool."""
+        if self.batch and self.mode != "sheet":
+            self.pending.append(self.executor.submit(render_batch, self.N, self.batch, self.backend))
+            self.batch = []
+
+    def close(self):
+        """Wait for all queued renders and return (render_time, render_wait)."""
+        if self.mode == "sheet" and self.batch:
+            self.start()
+            self.pending.append(self.executor.submit(render_sheet, self.N, self.batch,
+                                                     f"{self.folder}/contact_sheet.png"))
+            self.batch = []
+        if self.executor is None:
+            return 0.0, 0.0
+
+        start_time = time.time()
+        self.flush()
+        wait(self.pending)
+        self.executor.shutdown()
+        self.executor = None
+        render_wait = time.time() - start_time
+
+        render_time = 0.0
+        for future in self.pending:
+            try:
+                render_time += future.result()
+            except Exception:
+                self.errors += 1
+        self.pending = []
+        return render_time, render_wait
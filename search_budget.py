@@ -0,0 +1,112 @@
+import json
+import os
+import threading
+import time
+
+STATUSES = ("complete", "timeout", "node_limit", "cancelled")
+
+
+class CancellationToken:
+    """Thread-safe stop flag; anything with is_set() (e.g. a multiprocessing.Event) works as well."""
+
+    def __init__(self):
+        self.event = threading.Event()
+
+    def cancel(self):
+        self.event.set()
+
+    def is_set(self):
+        return self.event.is_set()
+
+
+class SearchBudget:
+    """Wall-clock and node limits plus a cancellation token, shared by the solvers' hot loops.
+
+    Loops call `budget.spend()` for every node, which only counts; every
+    CHECK_INTERVAL nodes it returns True and the loop takes the slow path
+    (NQueensSolver.interrupted) that reads the clock and the token.
+    """
+    CHECK_INTERVAL = 1024
+
+    def __init__(self, time_limit=None, node_limit=None, cancel=None):
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.cancel = cancel
+        self.start()
+
+    def start(self):
+        """Reset the counters and the clock for a new run."""
+        self.status = "complete"
+        self.nodes = 0
+        self.deadline = None if self.time_limit is None else time.perf_counter() + self.time_limit
+        self.next_check = self.CHECK_INTERVAL
+        if self.node_limit is not None:
+            self.next_check = min(self.next_check, self.node_limit)
+
+    def spend(self, nodes=1):
+        """Charge work to the budget; True when the next exhausted() check is due."""
+        self.nodes += nodes
+        return self.nodes >= self.next_check
+
+    def exhausted(self):
+        """Check the token and the limits, recording why the search has to stop."""
+        self.next_check = self.nodes + self.CHECK_INTERVAL
+        if self.node_limit is not None:
+            self.next_check = min(self.next_check, self.node_limit)
+        if self.cancel is not None and self.cancel.is_set():
+            self.status = "cancelled"
+        elif self.node_limit is not None and self.nodes >= self.node_limit:
+            self.status = "node_limit"
+        elif self.deadline is not None and time.perf_counter() >= self.deadline:
+            self.status = "timeout"
+        return self.status != "complete"
+
+    @property
+    def stopped(self):
+        return self.status != "complete"
+
+
+class SearchCheckpoint:
+    """JSON file holding the position of an interrupted search, rewritten every `interval` seconds.
+
+    The position format belongs to the solver (a path of columns, a stack of
+    packed nodes, a candidate index); the file also keeps the counts so far and
+    a key that ties it to one search (N, solver, symmetry mode).
+    """
+
+    def __init__(self, path, interval=60.0):
+        self.path = path
+        self.interval = interval
+        self.last_save = time.monotonic()
+
+    def load(self, key):
+        """Saved state for `key`, or None when there is no checkpoint yet."""
+        try:
+            with open(self.path) as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return None
+        if saved["key"] != json.loads(json.dumps(key)):  # Compare as JSON: tuples come back as lists
+            raise ValueError(f"Checkpoint {self.path} belongs to another search: {saved['key']}")
+        return saved
+
+    def due(self):
+        return time.monotonic() - self.last_save >= self.interval
+
+    def save(self, key, position, solutions_found, orbit_sizes):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"key": key, "position": position, "solutions_found": solutions_found,
+                       "orbit_sizes": orbit_sizes, "saved_at": time.time()}, f)
+        os.replace(tmp_path, self.path)
+        self.last_save = time.monotonic()
+
+    def clear(self):
+        """Remove the file once the search it belongs to has completed."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
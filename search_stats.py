@@ -0,0 +1,83 @@
+import numpy as np
+
+
+class SearchStats:
+    """Work counters that solvers report through while they search.
+
+    Solvers keep `stats = self.stats` in a local and only call into it behind
+    `if stats is not None`, so a run without stats pays one branch per node.
+    `on_sample(stats)` is called every `sample_every` nodes, which is the hook
+    for sampling profilers (e.g. grabbing sys._current_frames()).
+    """
+    __slots__ = ("nodes_expanded", "moves_rejected", "branching", "frontier_high_water",
+                 "sample_every", "on_sample", "next_sample")
+
+    def __init__(self, sample_every=0, on_sample=None):
+        self.sample_every = sample_every
+        self.on_sample = on_sample
+        self.reset()
+
+    def reset(self):
+        """Zero the counters; solvers call it at the start of every run."""
+        self.nodes_expanded = 0
+        self.moves_rejected = 0
+        self.branching = {}  # depth -> {children: number of nodes}
+        self.frontier_high_water = 0
+        self.next_sample = self.sample_every if self.on_sample and self.sample_every > 0 else -1
+
+    def expand(self, depth, children, rejected):
+        """A node at `depth` was expanded into `children` valid moves, `rejected` were not."""
+        self.nodes_expanded += 1
+        self.moves_rejected += rejected
+        histogram = self.branching.get(depth)
+        if histogram is None:
+            histogram = self.branching[depth] = {}
+        histogram[children] = histogram.get(children, 0) + 1
+        if self.nodes_expanded == self.next_sample:
+            self.next_sample += self.sample_every
+            self.on_sample(self)
+
+    def expand_many(self, depth, children, width):
+        """Several nodes at `depth` were expanded, each into children[i] of `width` possible moves."""
+        histogram = self.branching.setdefault(depth, {})
+        for count, nodes in zip(*np.unique(children, return_counts=True)):
+            histogram[int(count)] = histogram.get(int(count), 0) + int(nodes)
+        self.visit(len(children), len(children) * width - int(np.sum(children)))
+
+    def visit(self, nodes=1, rejected=0):
+        """Work of searches without a tree (candidates checked, individuals evaluated, ...)."""
+        self.nodes_expanded += nodes
+        self.moves_rejected += rejected
+        if self.next_sample > 0 and self.nodes_expanded >= self.next_sample:
+            self.next_sample = self.nodes_expanded + self.sample_every
+            self.on_sample(self)
+
+    def frontier(self, size):
+        """Record the current size of a queue, stack or heap."""
+        if size > self.frontier_high_water:
+            self.frontier_high_water = size
+
+    def merge(self, other):
+        """Add the counters of another run (a SearchStats or its as_dict())."""
+        if isinstance(other, SearchStats):
+            other = other.as_dict()
+        self.nodes_expanded += other["nodes_expanded"]
+        self.moves_rejected += other["moves_rejected"]
+        self.frontier_high_water = max(self.frontier_high_water, other["frontier_high_water"])
+        for depth, histogram in other["branching"].items():
+            mine = self.branching.setdefault(int(depth), {})
+            for children, count in histogram.items():
+                mine[int(children)] = mine.get(int(children), 0) + count
+
+    def mean_branching(self):
+        """Average number of valid children per expanded node, by depth."""
+        return {depth: sum(c * n for c, n in histogram.items()) / sum(histogram.values())
+                for depth, histogram in sorted(self.branching.items())}
+
+    def as_dict(self):
+        return {
+            "nodes_expanded": self.nodes_expanded,
+            "moves_rejected": self.moves_rejected,
+            "frontier_high_water": self.frontier_high_water,
+            "branching": {depth: dict(histogram) for depth, histogram in sorted(self.branching.items())},
+        }
@@ -0,0 +1,172 @@
+import atexit
+import hashlib
+import json
+import os
+import time
+from solution_store import SolutionStore, SolutionWriter
+
+DEFAULT_CACHE_DIR = os.environ.get("NQUEENS_CACHE_DIR",
+                                   os.path.join(os.path.expanduser("~"), ".cache", "n_queens"))
+INDEX_SAVE_INTERVAL = 60.0  # Seconds between index writes that only record last_used times
+
+# (path, checksum, mtime) of the solution files already hashed by this process
+VERIFIED = set()
+
+
+def file_checksum(path):
+    """SHA-256 of a file, used to detect corrupted cache entries."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class SolutionCache:
+    """On-disk cache of solution counts, fundamental solutions and run metrics per N and method.
+
+    Entries live in an index.json next to one packed SolutionStore file per entry.
+    The total size is bounded and the least recently used entries are evicted first.
+    Solution files are checked against their checksum the first time a process
+    opens them, counts are read from the index alone, and last_used times are
+    written back at most every INDEX_SAVE_INTERVAL seconds (and at exit).
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(directory, "index.json")
+        self.entries = self.load_index()
+        self.dirty = False  # last_used times not written to the index yet
+        self.saved_at = time.monotonic()
+        atexit.register(self.flush)
+
+    @classmethod
+    def existing(cls, directory=DEFAULT_CACHE_DIR):
+        """The cache at `directory` if one was ever written there, else None (nothing is created)."""
+        if os.path.exists(os.path.join(directory, "index.json")):
+            return cls(directory)
+        return None
+
+    def load_index(self):
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)["entries"]
+        except (OSError, ValueError, KeyError):
+            return {}  # Missing or corrupted index: start empty
+
+    def save_index(self):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"entries": self.entries}, f)
+        os.replace(tmp_path, self.index_path)
+        self.dirty = False
+        self.saved_at = time.monotonic()
+
+    def flush(self):
+        """Write pending last_used updates."""
+        if self.dirty:
+            self.save_index()
+
+    @staticmethod
+    def key(N, method):
+        return f"{method}:{N}"
+
+    def get(self, N, method=None, need_file=False):
+        """Cache entry for N (and method, when given), or None.
+
+        With `need_file` only entries whose solution file passes the integrity
+        check are returned.
+        """
+        keys = [self.key(N, method)] if method else [k for k, e in self.entries.items() if e["N"] == N]
+        for key in keys:
+            entry = self.entries.get(key)
+            if entry is None:
+                continue
+            if need_file and entry.get("file") and not self.verify(entry):
+                self.remove(key)
+                continue
+            entry["last_used"] = time.time()
+            self.dirty = True
+            if time.monotonic() - self.saved_at >= INDEX_SAVE_INTERVAL:
+                self.save_index()
+            return entry
+        return None
+
+    def verify(self, entry):
+        """Checksum test of an entry's file, done once per process and file version."""
+        path = os.path.join(self.directory, entry["file"])
+        try:
+            version = (path, entry["checksum"], os.stat(path).st_mtime_ns)
+        except OSError:
+            return False
+        if version not in VERIFIED:
+            if file_checksum(path) != entry["checksum"]:
+                return False
+            VERIFIED.add(version)
+        return True
+
+    def count(self, N, method=None):
+        """Total number of solutions for N, if any method enumerated it."""
+        entry = self.get(N, method)
+        return entry["count"] if entry else None
+
+    def fundamental_count(self, N, method=None):
+        """Number of fundamental (symmetry-distinct) solutions for N, if known."""
+        entry = self.get(N, method)
+        return entry.get("fundamental_count") if entry else None
+
+    def fundamental_solutions(self, N, method=None):
+        """Memory-mapped fundamental solutions for N, or None."""
+        entry = self.get(N, method, need_file=True)
+        if not entry or not entry.get("file"):
+            return None
+        return SolutionStore(os.path.join(self.directory, entry["file"]))
+
+    def put(self, N, method, count, fundamental=None, metrics=None):
+        """Store the results of a complete enumeration of N by `method`."""
+        os.makedirs(self.directory, exist_ok=True)
+        key = self.key(N, method)
+        entry = {"N": N, "method": method, "count": count, "metrics": metrics,
+                 "file": None, "checksum": None, "size": 0, "last_used": time.time()}
+        if fundamental is not None:
+            file_name = f"{method}_{N}.sol"
+            path = os.path.join(self.directory, file_name)
+            with SolutionWriter(path, N) as writer:
+                for state in fundamental:
+                    writer.write(state)
+            entry.update(file=file_name, checksum=file_checksum(path), size=os.path.getsize(path),
+                         fundamental_count=writer.count)
+            VERIFIED.add((path, entry["checksum"], os.stat(path).st_mtime_ns))
+        self.entries[key] = entry
+        self.evict(keep=key)
+        self.save_index()
+
+    def put_metrics(self, N, method, metrics):
+        """Attach the metrics of the latest run to an existing entry."""
+        entry = self.entries.get(self.key(N, method))
+        if entry is not None:
+            entry["metrics"] = metrics
+            self.save_index()
+
+    def remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry and entry.get("file"):
+            try:
+                os.remove(os.path.join(self.directory, entry["file"]))
+            except OSError:
+                pass
+        self.save_index()
+
+    def evict(self, keep=None):
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        by_age = sorted(self.entries, key=lambda k: self.entries[k]["last_used"])
+        total = sum(entry["size"] for entry in self.entries.values())
+        for key in by_age:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= self.entries[key]["size"]
+            self.remove(key)
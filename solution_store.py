@@ -0,0 +1,141 @@
+import os
+import struct
+import numpy as np
+
+MAGIC = b"NQSOL\x00"
+VERSION = 1
+HEADER = struct.Struct("<6sBBIBIQ")  # magic, version, packed, N, bits, row_bytes, count
+HEADER_SIZE = 32
+
+
+def column_bits(N):
+    """Bits needed to store one column index in the bit-packed encoding."""
+    return max(1, (N - 1).bit_length())
+
+
+def encode_rows(states, N, packed):
+    """Encode a (k, N) array of columns into (k, row_bytes) uint8 rows."""
+    states = np.asarray(states, dtype=np.uint32).reshape(-1, N)
+    if not packed:
+        return states.astype(np.uint8)
+    bits = column_bits(N)
+    bit_matrix = (states[:, :, None] >> np.arange(bits, dtype=np.uint32)) & 1
+    return np.packbits(bit_matrix.reshape(len(states), N * bits).astype(np.uint8), axis=1, bitorder="little")
+
+
+def decode_rows(rows, N, packed):
+    """Decode (k, row_bytes) uint8 rows back into a (k, N) array of columns."""
+    if not packed:
+        return rows
+    bits = column_bits(N)
+    bit_matrix = np.unpackbits(rows, axis=1, count=N * bits, bitorder="little").reshape(len(rows), N, bits)
+    return bit_matrix.astype(np.uint32) @ (1 << np.arange(bits, dtype=np.uint32))
+
+
+class SolutionWriter:
+    """Streams solutions into a packed file: one fixed-size row per solution.
+
+    Columns are stored as uint8 for N <= 255 and bit-packed otherwise. A writer
+    is callable, so it can be passed straight to NQueensSolver.count_solutions.
+    """
+
+    def __init__(self, path, N, packed=None, buffer_size=4096):
+        self.path = path
+        self.N = N
+        self.packed = N > 255 if packed is None else packed
+        if not self.packed and N > 256:
+            raise ValueError("uint8 rows only fit boards with N <= 256")
+        self.bits = column_bits(N) if self.packed else 8
+        self.row_bytes = (N * self.bits + 7) // 8
+        self.buffer_size = buffer_size
+        self.buffer = []
+        self.count = 0
+        self.file = open(path, "wb")
+        self.file.write(self.header())
+
+    def header(self):
+        return HEADER.pack(MAGIC, VERSION, int(self.packed), self.N, self.bits,
+                           self.row_bytes, self.count).ljust(HEADER_SIZE, b"\0")
+
+    def write(self, state):
+        """Buffer one solution; rows are encoded in batches."""
+        self.buffer.append(state)
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    __call__ = write
+
+    def write_many(self, states):
+        """Encode and append a batch of solutions (any (k, N) array-like) at once."""
+        self.flush()
+        rows = encode_rows(states, self.N, self.packed)
+        self.file.write(rows.tobytes())
+        self.count += len(rows)
+
+    def flush(self):
+        if self.buffer:
+            buffer, self.buffer = self.buffer, []
+            self.write_many(buffer)
+
+    def close(self):
+        """Flush pending rows and record the final count in the header."""
+        if self.file.closed:
+            return
+        self.flush()
+        self.file.seek(0)
+        self.file.write(self.header())
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SolutionStore:
+    """Memory-mapped, read-only view of a file written by SolutionWriter."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            magic, version, packed, N, bits, row_bytes, count = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a solution store")
+        self.N = N
+        self.packed = bool(packed)
+        self.row_bytes = row_bytes
+        # Trust the file size over the header so a writer that never closed is still readable
+        rows_on_disk = (os.path.getsize(path) - HEADER_SIZE) // row_bytes if row_bytes else count
+        self.count = min(count, rows_on_disk) if count else rows_on_disk
+        if self.count:
+            self.rows = np.memmap(path, dtype=np.uint8, mode="r", offset=HEADER_SIZE,
+                                  shape=(self.count, row_bytes))
+        else:
+            self.rows = np.zeros((0, row_bytes), dtype=np.uint8)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        """An int gives one solution (1-D), a slice or index array gives a (k, N) array."""
+        if isinstance(index, (int, np.integer)):
+            if not -self.count <= index < self.count:
+                raise IndexError("solution index out of range")
+            index %= self.count
+            return decode_rows(self.rows[index:index + 1], self.N, self.packed)[0]
+        return decode_rows(self.rows[index], self.N, self.packed)
+
+    def chunks(self, chunk_size=65536):
+        """Yield (start, (k, N) array) chunks without loading the whole file."""
+        for start in range(0, self.count, chunk_size):
+            yield start, self[start:start + chunk_size]
+
+    def __iter__(self):
+        for _, chunk in self.chunks():
+            yield from chunk
+
+    def where(self, predicate, chunk_size=65536):
+        """Indices of the solutions for which predicate((k, N) array) returns True."""
+        matches = [start + np.flatnonzero(predicate(chunk)) for start, chunk in self.chunks(chunk_size)]
+        return np.concatenate(matches) if matches else np.zeros(0, dtype=np.int64)
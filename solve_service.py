@@ -0,0 +1,234 @@
+"""Asyncio solve service over local HTTP or a Unix socket.
+
+Usage:
+    python -m solve_service --port 8080
+    python -m solve_service --unix /tmp/n_queens.sock
+
+    GET /count?n=10&method=backtracking-bitmask          -> {"N": 10, "method": ..., "count": 724, "status": ...}
+    GET /solutions?n=10&method=backtracking&limit=100    -> NDJSON, one board per line, chunked
+    GET /stats                                           -> cache and coalescing counters
+
+Method names are the ones of `python -m bench`. Every search runs under a time
+limit (the service's --time-limit, or a smaller time_limit=... in the query);
+a search that runs out reports status "timeout" (the X-Search-Status header of
+/solutions) with what it found so far, and is not cached. Solvers run in a process pool;
+identical requests that arrive while a result is being computed wait for that
+one computation, and finished results are kept in an in-memory LRU (bounded by
+entries and by bytes of stored boards).
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from bench import METHODS, make_solver
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+def compute_count(method, N, time_limit):
+    """Executor job: number of solutions found by `method` for N within time_limit."""
+    start_time = time.perf_counter()
+    solver = make_solver(method, N, time_limit=time_limit)
+    count = solver.count_solutions()
+    return {"N": N, "method": method, "count": count, "status": solver.status,
+            "time": time.perf_counter() - start_time}
+
+
+def compute_solutions(method, N, limit, time_limit):
+    """Executor job: (boards found by `method` for N as a (count, N) array, search status)."""
+    solver = make_solver(method, N, time_limit=time_limit)
+    dtype = np.uint16 if N <= 1 << 16 else np.uint32  # Columns go up to N - 1
+    boards = [np.asarray(state, dtype=dtype) for state in solver.iter_solutions(limit)]
+    return (np.stack(boards) if boards else np.zeros((0, N), dtype=dtype)), solver.status
+
+
+class SolveService:
+    """Coalescing, caching front end of the solvers; the HTTP layer is in handle()."""
+
+    def __init__(self, workers=None, cache_entries=256, cache_bytes=64 * 1024 * 1024, chunk_size=1000,
+                 time_limit=60.0):
+        # Forked workers would inherit the open client sockets (and keep those connections open),
+        # so workers come from a forkserver, or are spawned where there is none
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        self.executor = ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1, mp_context=context)
+        self.cache_entries = cache_entries
+        self.cache_bytes = cache_bytes
+        self.chunk_size = chunk_size  # Boards per chunk of a /solutions response
+        self.time_limit = time_limit  # Longest search a request can ask for, in seconds
+        self.cache = OrderedDict()  # key -> result, least recently used first
+        self.cached_bytes = 0
+        self.in_flight = {}  # key -> asyncio.Future of a running computation
+        self.counters = {"requests": 0, "hits": 0, "coalesced": 0, "computed": 0, "evictions": 0}
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+
+    async def result(self, key, job, *args):
+        """Cached result of `job(*args)`, joining a running computation of the same key if there is one."""
+        self.counters["requests"] += 1
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.counters["hits"] += 1
+            return self.cache[key]
+        future = self.in_flight.get(key)
+        if future is not None:
+            self.counters["coalesced"] += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().run_in_executor(self.executor, job, *args)
+        self.in_flight[key] = future
+        try:
+            value = await asyncio.shield(future)  # A disconnecting client must not cancel the others' result
+        finally:
+            del self.in_flight[key]
+        self.counters["computed"] += 1
+        if self.status(value) == "complete":  # Partial results of a stopped search are not reused
+            self.store(key, value)
+        return value
+
+    @staticmethod
+    def status(value):
+        return value[1] if isinstance(value, tuple) else value["status"]
+
+    @staticmethod
+    def size(value):
+        return value[0].nbytes if isinstance(value, tuple) else 0
+
+    def store(self, key, value):
+        size = self.size(value)
+        if size > self.cache_bytes:
+            return
+        self.cache[key] = value
+        self.cached_bytes += size
+        while len(self.cache) > self.cache_entries or self.cached_bytes > self.cache_bytes:
+            _, evicted = self.cache.popitem(last=False)
+            self.cached_bytes -= self.size(evicted)
+            self.counters["evictions"] += 1
+
+    async def count(self, method, N, time_limit=None):
+        time_limit = self.request_time_limit(time_limit)
+        return await self.result(("count", method, N, time_limit), compute_count, method, N, time_limit)
+
+    async def solutions(self, method, N, limit=None, time_limit=None):
+        """(boards as a (count, N) array, search status)."""
+        time_limit = self.request_time_limit(time_limit)
+        return await self.result(("solutions", method, N, limit, time_limit), compute_solutions,
+                                 method, N, limit, time_limit)
+
+    def request_time_limit(self, time_limit):
+        """The time limit asked for, capped by the service's."""
+        if time_limit is None:
+            return self.time_limit
+        return time_limit if self.time_limit is None else min(time_limit, self.time_limit)
+
+    def stats(self):
+        return dict(self.counters, cached_entries=len(self.cache), cached_bytes=self.cached_bytes,
+                    in_flight=len(self.in_flight))
+
+    # HTTP/1.1, one request per connection
+
+    async def handle(self, reader, writer):
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            while (await reader.readline()).strip():
+                pass  # Headers are not used
+            if len(request_line) != 3:
+                await self.respond(writer, 400, {"error": "malformed request"})
+            elif request_line[0] != "GET":
+                await self.respond(writer, 405, {"error": "only GET is supported"})
+            else:
+                await self.route(writer, request_line[1])
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, writer, target):
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if url.path == "/stats":
+            return await self.respond(writer, 200, self.stats())
+        if url.path not in ("/count", "/solutions"):
+            return await self.respond(writer, 404, {"error": f"unknown path {url.path}"})
+
+        method = query.get("method", "backtracking-bitmask")
+        try:
+            N = int(query["n"])
+            limit = int(query["limit"]) if "limit" in query else None
+            time_limit = float(query["time_limit"]) if "time_limit" in query else None
+        except (KeyError, ValueError):
+            return await self.respond(writer, 400, {"error": "n (and limit) must be integers, time_limit a number"})
+        if method not in METHODS or N < 1:
+            return await self.respond(writer, 400, {"error": f"unknown method {method!r} or bad n"})
+
+        try:
+            if url.path == "/count":
+                return await self.respond(writer, 200, await self.count(method, N, time_limit))
+            boards, status = await self.solutions(method, N, limit, time_limit)
+        except Exception as error:
+            return await self.respond(writer, 500, {"error": repr(error)})
+        await self.stream(writer, boards, status)
+
+    async def respond(self, writer, status, body):
+        data = json.dumps(body).encode()
+        writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode() + data)
+        await writer.drain()
+
+    async def stream(self, writer, boards, status="complete"):
+        """Send boards as NDJSON with chunked transfer encoding, chunk_size boards per chunk."""
+        writer.write(f"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nX-Search-Status: {status}\r\n"
+                     f"Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n".encode())
+        for start in range(0, len(boards), self.chunk_size):
+            chunk = boards[start:start + self.chunk_size].tolist()
+            data = "".join(f"[{','.join(map(str, board))}]\n" for board in chunk).encode()
+            writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            await writer.drain()  # Back-pressure: slow clients do not pile up chunks in memory
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def serve(self, host="127.0.0.1", port=8080, unix_path=None):
+        if unix_path is not None:
+            server = await asyncio.start_unix_server(self.handle, unix_path)
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m solve_service", description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--unix", help="listen on this Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, help="solver processes (default: CPU count)")
+    parser.add_argument("--cache-entries", type=int, default=256)
+    parser.add_argument("--cache-mb", type=float, default=64.0, help="memory for cached boards")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="boards per streamed chunk")
+    parser.add_argument("--time-limit", type=float, default=60.0, help="seconds a request's search may run")
+    args = parser.parse_args(argv)
+
+    service = SolveService(args.workers, args.cache_entries, int(args.cache_mb * 1024 * 1024), args.chunk_size,
+                           args.time_limit)
+    print(f"Serving on {args.unix or f'http://{args.host}:{args.port}'}")
+    try:
+        asyncio.run(service.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+import numpy as np
+
+
+def transforms(state):
+    """Return the 8 symmetric copies (rotations and reflections) of a complete board."""
+    N = len(state)
+    inverse = [0] * N
+    for row, col in enumerate(state):
+        inverse[col] = row
+
+    rot90 = tuple(N - 1 - inverse[i] for i in range(N))
+    rot180 = tuple(N - 1 - col for col in reversed(state))
+    rot270 = tuple(inverse[N - 1 - i] for i in range(N))
+    rotations = [tuple(state), rot90, rot180, rot270]
+    reflections = [tuple(N - 1 - col for col in r) for r in rotations]
+    return rotations + reflections
+
+
+def canonical_form(state):
+    """Lexicographically smallest of the 8 symmetric copies of a board."""
+    return min(transforms(state))
+
+
+def orbit_size(state):
+    """Number of distinct boards in the symmetry class of a solution (1, 2, 4 or 8)."""
+    return len(set(transforms(state)))
+
+
+# Batched transforms and integer keys. Boards are permutations (one queen per
+# row and column), so a board is identified by its rank among the N! permutations
+# in lexicographic order; ranks compare like the boards, so the smallest rank of
+# an orbit is the rank of its canonical form.
+
+MAX_ARRAY_N = 20  # 20! < 2**63: ranks up to this N fit in int64 arrays
+
+
+def batch_transforms(states):
+    """The 8 symmetric copies of every board of a (count, N) array, as an (8, count, N) array.
+
+    Same order as transforms(): the 4 rotations, then their mirror images.
+    """
+    states = np.asarray(states, dtype=np.int64)
+    count, N = states.shape
+    inverse = np.empty_like(states)
+    np.put_along_axis(inverse, states, np.broadcast_to(np.arange(N), states.shape), axis=1)
+
+    rot90 = N - 1 - inverse
+    rot180 = N - 1 - states[:, ::-1]
+    rot270 = inverse[:, ::-1]
+    rotations = np.stack([states, rot90, rot180, rot270])
+    return np.concatenate([rotations, N - 1 - rotations])
+
+
+def permutation_rank(state):
+    """Lexicographic rank of a board among the N! permutations of its columns, in O(N)."""
+    N = len(state)
+    rank = 0
+    used = 0
+    for row, col in enumerate(state):
+        # Lehmer digit: unused columns smaller than col
+        rank = rank * (N - row) + col - (used & ((1 << col) - 1)).bit_count()
+        used |= 1 << col
+    return rank
+
+
+def permutation_unrank(rank, N):
+    """Inverse of permutation_rank."""
+    digits = []
+    for radix in range(1, N + 1):
+        rank, digit = divmod(rank, radix)
+        digits.append(digit)
+    free = list(range(N))
+    return tuple(free.pop(digit) for digit in reversed(digits))
+
+
+def batch_permutation_ranks(states):
+    """permutation_rank of every board of a (count, N) array (N <= MAX_ARRAY_N), as int64."""
+    states = np.asarray(states, dtype=np.int64)
+    count, N = states.shape
+    if N > MAX_ARRAY_N:
+        raise ValueError(f"Ranks of {N}x{N} boards do not fit in int64; use permutation_rank")
+    ranks = np.zeros(count, dtype=np.int64)
+    for row in range(N):
+        digits = (states[:, row + 1:] < states[:, row:row + 1]).sum(axis=1)
+        ranks = ranks * (N - row) + digits
+    return ranks
+
+
+def canonical_key(state):
+    """Integer key of a board's symmetry class: the rank of its canonical form."""
+    return permutation_rank(canonical_form(state))
+
+
+def batch_canonical_keys(states):
+    """canonical_key of every board of a (count, N) array, as int64."""
+    states = np.asarray(states)
+    count, N = states.shape
+    if count == 0:
+        return np.zeros(0, dtype=np.int64)
+    copies = batch_transforms(states).reshape(8 * count, N)
+    return batch_permutation_ranks(copies).reshape(8, count).min(axis=0)
+
+
+class DedupIndex:
+    """Set of symmetry classes of N x N boards, stored as canonical keys.
+
+    Keys go into a small Python set first and are merged into a sorted int64
+    array every `buffer_size` insertions, so millions of classes take 8 bytes
+    each instead of a tuple each. Above MAX_ARRAY_N keys are Python ints in a set.
+    """
+
+    def __init__(self, N, buffer_size=65536):
+        self.N = N
+        self.buffer_size = buffer_size
+        self.pending = set()
+        self.merged = np.zeros(0, dtype=np.int64)
+        self.fits_array = N <= MAX_ARRAY_N
+
+    def __len__(self):
+        return len(self.merged) + len(self.pending)
+
+    def __contains__(self, state):
+        return self.contains_key(canonical_key(state))
+
+    def contains_key(self, key):
+        if key in self.pending:
+            return True
+        index = np.searchsorted(self.merged, key)
+        return index < len(self.merged) and self.merged[index] == key
+
+    def add(self, state):
+        """Record the class of a board; True if it was not known yet."""
+        return self.add_key(canonical_key(state))
+
+    def add_key(self, key):
+        if self.contains_key(key):
+            return False
+        self.pending.add(key)
+        if self.fits_array and len(self.pending) >= self.buffer_size:
+            self.merge()
+        return True
+
+    def update_keys(self, keys):
+        for key in keys:
+            self.add_key(key)
+
+    def add_batch(self, states):
+        """Record the classes of a (count, N) array of boards; mask of the boards that were new.
+
+        Only the first board of a class that appears several times in the batch counts as new.
+        New keys are buffered like those of add_key, so the sorted array is only rebuilt
+        every `buffer_size` keys rather than on every batch.
+        """
+        states = np.asarray(states)
+        if not self.fits_array:
+            return np.array([self.add(tuple(int(col) for col in state)) for state in states], dtype=bool)
+        keys = batch_canonical_keys(states)
+        _, first = np.unique(keys, return_index=True)
+        new = np.zeros(len(keys), dtype=bool)
+        new[first] = True
+        if len(self.merged):
+            index = np.minimum(np.searchsorted(self.merged, keys), len(self.merged) - 1)
+            new &= self.merged[index] != keys
+        if self.pending:
+            pending = self.pending
+            new &= np.fromiter((key not in pending for key in keys.tolist()), dtype=bool, count=len(keys))
+        self.pending.update(keys[new].tolist())
+        if len(self.pending) >= self.buffer_size:
+            self.merge()
+        return new
+
+    def merge(self):
+        """Move the buffered keys into the sorted array."""
+        if self.fits_array and self.pending:
+            self.merged = np.union1d(self.merged, np.fromiter(self.pending, dtype=np.int64, count=len(self.pending)))
+            self.pending.clear()
+
+    def keys(self):
+        """All keys in increasing order, which is the lexicographic order of the canonical boards."""
+        self.merge()
+        if self.fits_array:
+            return self.merged
+        return sorted(self.pending)
+
+    def boards(self):
+        """Canonical boards of all classes, in lexicographic order."""
+        for key in self.keys():
+            yield permutation_unrank(int(key), self.N)
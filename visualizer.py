@@ -1,9 +1,93 @@
-import matplotlib.pyplot as plt
+import struct
+import zlib
 import numpy as np
 
+BACKENDS = ("raster", "svg", "matplotlib")
+
+LIGHT = (240, 217, 181)
+DARK = (181, 136, 99)
+QUEEN = (200, 30, 30)
+GAP = (255, 255, 255)
+
+
+def cell_size(N, target=512):
+    """Pixels per square so that a board is about `target` pixels wide."""
+    return max(1, min(48, target // N))
+
+
+def queen_mask(cell):
+    """Disc inscribed in a cell x cell square (the whole square for tiny cells)."""
+    if cell < 4:
+        return np.ones((cell, cell), dtype=bool)
+    center = (cell - 1) / 2
+    y, x = np.ogrid[:cell, :cell]
+    return (x - center) ** 2 + (y - center) ** 2 <= (cell * 0.38) ** 2
+
+
+def contact_sheet(N, states, columns=None, cell=None, gap=None):
+    """Tile boards into one RGB uint8 image; a single board is a sheet of one.
+
+    `states` is any (count, N) array-like of columns per row. Squares are drawn
+    as whole blocks of pixels with NumPy broadcasting, nothing per pixel in Python.
+    """
+    states = np.asarray(states, dtype=np.int64).reshape(-1, N)
+    count = len(states)
+    columns = columns or max(1, int(np.ceil(np.sqrt(count))))
+    rows = max(1, -(-count // columns))
+    cell = cell or cell_size(N, 64 if count > 1 else 512)
+    gap = (1 if count > 1 else 0) if gap is None else gap
+    size = N * cell
+
+    # (count, N, cell, N, cell) pixels: square colors, then queens on top
+    squares = (np.add.outer(np.arange(N), np.arange(N)) % 2).astype(bool)
+    queens = np.zeros((count, N, N), dtype=bool)
+    queens[np.repeat(np.arange(count), N), np.tile(np.arange(N), count), states.ravel()] = True
+    pixels = np.empty((count, N, cell, N, cell, 3), dtype=np.uint8)
+    pixels[:] = np.where(squares[:, None, :, None, None], DARK, LIGHT)
+    pixels[queens[:, :, None, :, None] & queen_mask(cell)[None, None, :, None, :]] = QUEEN
+
+    # Every tile gets a gap on its right and bottom; the sheet is then a reshape
+    padded = np.empty((rows * columns, size + gap, size + gap, 3), dtype=np.uint8)
+    padded[:] = GAP
+    padded[:count, :size, :size] = pixels.reshape(count, size, size, 3)
+    image = padded.reshape(rows, columns, size + gap, size + gap, 3).transpose(0, 2, 1, 3, 4)
+    image = image.reshape(rows * (size + gap), columns * (size + gap), 3)
+    return image[:image.shape[0] - gap, :image.shape[1] - gap]
+
+
+def encode_png(image):
+    """PNG bytes of an RGB uint8 image (zlib, no filtering)."""
+    height, width, _ = image.shape
+    raw = np.zeros((height, width * 3 + 1), dtype=np.uint8)  # Filter byte 0 at the start of every row
+    raw[:, 1:] = image.reshape(height, width * 3)
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)  # 8-bit RGB
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw.tobytes(), 6))
+            + chunk(b"IEND", b""))
+
+
+def board_svg(N, state, cell=20):
+    """SVG of a board: a checkerboard pattern plus one circle per queen, O(N) in size."""
+    size = N * cell
+    light, dark, queen = (f"rgb{color}" for color in (LIGHT, DARK, QUEEN))
+    circles = "".join(f'<circle cx="{col * cell + cell / 2}" cy="{row * cell + cell / 2}" r="{cell * 0.38}"/>'
+                      for row, col in enumerate(state))
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" viewBox="0 0 {size} {size}">'
+            f'<defs><pattern id="squares" width="{2 * cell}" height="{2 * cell}" patternUnits="userSpaceOnUse">'
+            f'<rect width="{2 * cell}" height="{2 * cell}" fill="{light}"/>'
+            f'<rect x="{cell}" width="{cell}" height="{cell}" fill="{dark}"/>'
+            f'<rect y="{cell}" width="{cell}" height="{cell}" fill="{dark}"/></pattern></defs>'
+            f'<rect width="{size}" height="{size}" fill="url(#squares)"/>'
+            f'<g fill="{queen}">{circles}</g></svg>')
+
+
+def visualize_matplotlib(N, state, output_path):
+    """The original figure: a matshow of the board with a label per cell (slow, imports matplotlib)."""
+    import matplotlib.pyplot as plt
 
-def visualize_solution(N, state, output_path):
-    """Visualize and save the N-Queens solution."""
     board = [['.' for _ in range(N)] for _ in range(N)]
     for row, col in enumerate(state):
         board[row][col] = 'Q'
@@ -18,3 +102,30 @@ def visualize_solution(N, state, output_path):
     plt.axis('off')  # Turn off the axis
     plt.savefig(output_path)
     plt.close()
+
+
+def visualize_solution(N, state, output_path, backend=None):
+    """Visualize and save the N-Queens solution.
+
+    The backend defaults to "svg" for .svg paths and "raster" (a PNG) otherwise;
+    matplotlib is only imported for backend="matplotlib".
+    """
+    backend = backend or ("svg" if output_path.endswith(".svg") else "raster")
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown visualizer backend: {backend!r}")
+    if backend == "matplotlib":
+        visualize_matplotlib(N, state, output_path)
+    elif backend == "svg":
+        with open(output_path, "w") as f:
+            f.write(board_svg(N, state))
+    else:
+        with open(output_path, "wb") as f:
+            f.write(encode_png(contact_sheet(N, [state])))
+
+
+def save_contact_sheet(N, states, output_path, columns=None, cell=None):
+    """Tile many solutions into one PNG; returns the (height, width) of the image."""
+    image = contact_sheet(N, states, columns, cell)
+    with open(output_path, "wb") as f:
+        f.write(encode_png(image))
+    return image.shape[:2]
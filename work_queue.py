@@ -0,0 +1,240 @@
+"""Distributed enumeration over a shared SQLite job queue.
+
+Usage:
+    python -m work_queue publish --db queue.sqlite --n 18 --depth 3
+    python -m work_queue worker --db queue.sqlite --solutions results/   # on every host
+    python -m work_queue status --db queue.sqlite
+    python -m work_queue run --db queue.sqlite --n 12 --workers 4        # everything on one box
+
+The coordinator splits the search tree into the prefix jobs of parallel_search
+and stores them in one SQLite file; workers on any host that can reach the file
+(e.g. over a shared filesystem) lease jobs, complete each prefix with the bitmask
+backtracking search and report the count, plus a packed solution file when asked.
+A job whose lease runs out (its worker died or lost the filesystem) goes back to
+the queue and is leased again. Leases use wall-clock time, so hosts need roughly
+synchronized clocks.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import sys
+import time
+
+from methods.backtracking import BacktrackingSolver
+from parallel_search import prefix_subproblems
+from solution_store import SolutionWriter
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    prefix TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    count INTEGER,
+    fundamentals INTEGER,
+    solutions_file TEXT,
+    elapsed REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_until);
+"""
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class WorkQueue:
+    """Prefix jobs of one enumeration in a SQLite file shared by a coordinator and its workers.
+
+    Jobs go pending -> leased -> done. A leased job whose lease_until has passed
+    counts as pending again, which is how lost jobs are re-leased.
+    """
+
+    def __init__(self, path, lease_time=600.0):
+        self.path = path
+        self.lease_time = lease_time
+        # Autocommit mode; writes take the database lock explicitly with BEGIN IMMEDIATE
+        self.db = sqlite3.connect(path, timeout=60.0, isolation_level=None)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def meta(self):
+        """Parameters of the published search (N, symmetry, depth), or {} before publish()."""
+        return {key: json.loads(value) for key, value in self.db.execute("SELECT key, value FROM meta")}
+
+    def publish(self, N, depth=3, symmetry=False):
+        """Split the search for N into prefix jobs; returns the number of jobs published."""
+        if self.meta():
+            raise ValueError(f"{self.path} already holds a search: {self.meta()}")
+        prefixes = prefix_subproblems(N, depth)
+        if symmetry:
+            prefixes = [prefix for prefix in prefixes if BacktrackingSolver(N, symmetry=True).prefix_allowed(prefix)]
+        self.db.execute("BEGIN IMMEDIATE")
+        self.db.executemany("INSERT INTO meta (key, value) VALUES (?, ?)",
+                            [(key, json.dumps(value)) for key, value in
+                             (("N", N), ("depth", depth), ("symmetry", symmetry))])
+        self.db.executemany("INSERT INTO jobs (prefix) VALUES (?)", [(json.dumps(prefix),) for prefix in prefixes])
+        self.db.execute("COMMIT")
+        return len(prefixes)
+
+    def lease(self, worker):
+        """Take the next pending (or expired) job for `worker`: (job id, prefix), or None."""
+        now = time.time()
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.db.execute(
+                "SELECT id, prefix FROM jobs WHERE status = 'pending' OR (status = 'leased' AND lease_until < ?) "
+                "ORDER BY id LIMIT 1", (now,)).fetchone()
+            if row is not None:
+                self.db.execute("UPDATE jobs SET status = 'leased', worker = ?, lease_until = ?, "
+                                "attempts = attempts + 1 WHERE id = ?", (worker, now + self.lease_time, row[0]))
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        return None if row is None else (row[0], json.loads(row[1]))
+
+    def complete(self, job_id, worker, count, fundamentals, elapsed, solutions_file=None):
+        """Record the result of a job; False if it was already completed by another lease."""
+        cursor = self.db.execute(
+            "UPDATE jobs SET status = 'done', worker = ?, count = ?, fundamentals = ?, elapsed = ?, "
+            "solutions_file = ?, lease_until = NULL WHERE id = ? AND status != 'done'",
+            (worker, count, fundamentals, elapsed, solutions_file, job_id))
+        return cursor.rowcount == 1
+
+    def progress(self):
+        """Jobs per state ('pending' includes expired leases) and the solutions counted so far."""
+        now = time.time()
+        states = {"pending": 0, "leased": 0, "done": 0}
+        for status, lease_until, jobs in self.db.execute(
+                "SELECT status, lease_until < ?, COUNT(*) FROM jobs GROUP BY status, lease_until < ?", (now, now)):
+            states["pending" if status == "leased" and lease_until else status] += jobs
+        count, fundamentals = self.db.execute(
+            "SELECT COALESCE(SUM(count), 0), COALESCE(SUM(fundamentals), 0) FROM jobs WHERE status = 'done'").fetchone()
+        return dict(states, jobs=sum(states.values()), solutions_found=count, fundamental_solutions=fundamentals)
+
+    def result(self):
+        """Total number of solutions once every job is done, else None."""
+        progress = self.progress()
+        return progress["solutions_found"] if progress["done"] == progress["jobs"] else None
+
+    def solution_files(self):
+        """Packed solution files of the finished jobs, in prefix order."""
+        return [row[0] for row in self.db.execute(
+            "SELECT solutions_file FROM jobs WHERE status = 'done' AND solutions_file IS NOT NULL ORDER BY id")]
+
+
+def solve_job(N, symmetry, prefix, solutions_path=None, worker=None):
+    """Complete one prefix: (orbit-weighted count, boards kept), writing them to `solutions_path` if given.
+
+    In symmetry mode only the canonical boards are kept (and written). The file is
+    written under a temporary name of its own per `worker`, since an expired lease
+    can leave two workers on the same job.
+    """
+    solver = BacktrackingSolver(N, render="off", engine="bitmask", symmetry=symmetry)
+    writer = None
+    if solutions_path is not None:
+        tmp_path = f"{solutions_path}.{(worker or worker_name()).replace(':', '-')}.tmp"
+        writer = SolutionWriter(tmp_path, N)
+    kept = 0
+    for state in solver.bitmask_search(prefix):
+        if solver.count_solution(state):
+            kept += 1
+            if writer is not None:
+                writer.write(state)
+    if writer is not None:
+        writer.close()
+        os.replace(tmp_path, solutions_path)  # Only finished jobs leave a file behind
+    return solver.solutions_found, kept
+
+
+def run_worker(db_path, solutions_dir=None, lease_time=600.0, wait=False, poll_interval=2.0):
+    """Lease and complete jobs until the queue is empty; returns the number of jobs completed.
+
+    With `wait`, an idle worker keeps polling while other workers still hold
+    leases, so it can pick up their jobs if those leases expire.
+    """
+    name = worker_name()
+    completed = 0
+    with WorkQueue(db_path, lease_time) as queue:
+        meta = queue.meta()
+        N, symmetry = meta["N"], meta["symmetry"]
+        if solutions_dir is not None:
+            os.makedirs(solutions_dir, exist_ok=True)
+        while True:
+            job = queue.lease(name)
+            if job is None:
+                progress = queue.progress()
+                if not wait or progress["done"] == progress["jobs"]:
+                    return completed
+                time.sleep(poll_interval)
+                continue
+            job_id, prefix = job
+            start_time = time.time()
+            solutions_path = None
+            if solutions_dir is not None:
+                solutions_path = os.path.join(solutions_dir, f"job_{job_id:06d}.sol")
+            count, kept = solve_job(N, symmetry, prefix, solutions_path, name)
+            fundamentals = kept if symmetry else None
+            if queue.complete(job_id, name, count, fundamentals, time.time() - start_time, solutions_path):
+                completed += 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m work_queue", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    for command in ("publish", "worker", "status", "run"):
+        sub = commands.add_parser(command)
+        sub.add_argument("--db", required=True, help="SQLite queue file (on a shared filesystem for remote workers)")
+        if command in ("publish", "run"):
+            sub.add_argument("--n", type=int, required=True)
+            sub.add_argument("--depth", type=int, default=3, help="rows fixed by each prefix job")
+            sub.add_argument("--symmetry", action="store_true", help="only enumerate fundamental solutions")
+        if command in ("worker", "run"):
+            sub.add_argument("--solutions", help="directory for one packed solution file per job")
+            sub.add_argument("--lease", type=float, default=600.0, help="seconds before a lost job is re-leased")
+        if command == "worker":
+            sub.add_argument("--wait", action="store_true", help="keep polling until every job is done")
+        if command == "run":
+            sub.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    if args.command in ("publish", "run"):
+        with WorkQueue(args.db) as queue:
+            if not queue.meta():
+                print(f"Published {queue.publish(args.n, args.depth, args.symmetry)} jobs for N={args.n}")
+    if args.command == "worker":
+        print(f"{worker_name()} completed {run_worker(args.db, args.solutions, args.lease, args.wait)} jobs")
+    if args.command == "run":
+        processes = [multiprocessing.Process(target=run_worker, args=(args.db, args.solutions, args.lease, True))
+                     for _ in range(args.workers)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+    with WorkQueue(args.db) as queue:
+        progress = queue.progress()
+        print(f"N={queue.meta().get('N')}: {progress['done']}/{progress['jobs']} jobs done, "
+              f"{progress['leased']} leased, {progress['solutions_found']} solutions")
+        if queue.meta().get("symmetry"):
+            print(f"Fundamental solutions: {progress['fundamental_solutions']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())